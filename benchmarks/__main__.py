@@ -0,0 +1,41 @@
+# Project: django-easy-validator
+# File : __main__.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# runs the rule and the validator benchmarks and reports them together.
+#
+#   python -m benchmarks --format json --output benchmarks.json
+
+import argparse
+
+from .common import get_environment, write_results
+from . import rules, validators
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='run every benchmark of django-easy-validator')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    parser.add_argument('--output', default=None, help='write the results to the file')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to run each case at least')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    results = {
+        'environment': get_environment(),
+        'rules': rules.run(min_time=args.min_time),
+        'validators': validators.run(min_time=args.min_time)
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            write_results(results, args.format, f)
+    else:
+        write_results(results, args.format)
+
+
+if __name__ == '__main__':
+    main()
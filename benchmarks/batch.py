@@ -0,0 +1,82 @@
+# Project: django-easy-validator
+# File : batch.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# compares Validator.validate_many with validating the same records one by one, with pure rules and with
+# database rules.
+#
+#   python -m benchmarks.batch --records 10000 --repeat 5
+
+import argparse
+import timeit
+
+from .common import setup_django
+
+setup_django(database=True)
+
+from validator import Validator  # noqa: E402
+
+
+class RecordValidator(Validator):
+    username = 'required|alpha_dash|min_length:4|max_length:16'
+    email = 'required|email'
+    age = 'required|integer|percentage'
+    birthday = 'date'
+    cellphone = 'cellphone'
+
+
+class AccountValidator(Validator):
+    username = 'required|alpha_dash|unique:AUTH_USER_MODEL,username'
+    inviter = 'exist:AUTH_USER_MODEL,username'
+
+
+def get_records(count):
+    records = []
+    for i in range(count):
+        records.append({
+            'username': 'user_{}'.format(i),
+            'email': 'user{}@example.com'.format(i),
+            'age': str(18 + i % 90) if i % 10 else 'abc',
+            'birthday': '1990-01-{:02d}'.format(1 + i % 28),
+            'cellphone': '138{:08d}'.format(i)
+        })
+    return records
+
+
+def get_accounts(count):
+    return [{'username': 'user_{}'.format(i), 'inviter': 'younger' if i % 2 else 'bear'} for i in range(count)]
+
+
+def validate_loop(validator_class, records):
+    return [validator_class(record).validate() for record in records]
+
+
+def validate_many(validator_class, records):
+    return validator_class.validate_many(records)
+
+
+def compare(title, validator_class, records, repeat):
+    loop = min(timeit.repeat(lambda: validate_loop(validator_class, records), number=1, repeat=repeat))
+    many = min(timeit.repeat(lambda: validate_many(validator_class, records), number=1, repeat=repeat))
+
+    print(title)
+    print('  loop          : {:.4f}s'.format(loop))
+    print('  validate_many : {:.4f}s'.format(many))
+    print('  speedup       : {:.2f}x'.format(loop / many))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the batch validation')
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('records       : {}'.format(args.records))
+    compare('pure rules', RecordValidator, get_records(args.records), args.repeat)
+    compare('database rules', AccountValidator, get_accounts(args.records), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Project: django-easy-validator
+# File : common.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+
+import sys
+import json
+import time
+import platform
+
+import django
+from django.conf import settings
+
+
+def setup_django(database=False):
+    if not settings.configured:
+        settings.configure(
+            USE_I18N=False,
+            INSTALLED_APPS=[
+                'django.contrib.auth',
+                'django.contrib.contenttypes'
+            ],
+            DATABASES={
+                'default': {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': ':memory:'
+                }
+            }
+        )
+        django.setup()
+
+    if database:
+        from django.core.management import call_command
+        from django.contrib.auth.models import User
+
+        call_command('migrate', verbosity=0, interactive=False)
+        if not User.objects.filter(username='younger').exists():
+            User.objects.create_user('younger', 'younger@example.com', '123456789')
+            User.objects.create_user('bear', 'bear@example.com', '123456789')
+
+
+def measure(func, min_time=0.2, repeat=3):
+    # runs the func in loops long enough to be measured and returns the best of the repeats
+    number = 1
+    while True:
+        elapsed = timeit(func, number)
+        if elapsed >= min_time / 10 or number >= 1 << 24:
+            break
+        number = number * 10
+
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timeit(func, number) for _ in range(repeat))
+    return {
+        'number': number,
+        'ns_per_op': best / number * 1e9,
+        'ops_per_sec': number / best if best else float('inf')
+    }
+
+
+def timeit(func, number):
+    begin = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - begin
+
+
+def get_environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'django': django.get_version(),
+        'platform': platform.platform()
+    }
+
+
+def write_results(results, output_format='table', output=None):
+    output = output if output else sys.stdout
+    if 'json' == output_format:
+        json.dump(results, output, indent=2)
+        output.write('\n')
+        return
+
+    for section, rows in results.items():
+        if not isinstance(rows, list):
+            continue
+
+        output.write('\n{}\n'.format(section))
+        for row in rows:
+            name = ' '.join(str(v) for k, v in row.items() if k not in ('number', 'ns_per_op', 'ops_per_sec'))
+            output.write('  {:<48} {:>14.1f} ns/op {:>14.0f} ops/s\n'.format(name, row['ns_per_op'],
+                                                                            row['ops_per_sec']))
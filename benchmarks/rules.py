@@ -0,0 +1,146 @@
+# Project: django-easy-validator
+# File : rules.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# measures the throughput of every rule in default_rules with passing, failing and worst case values.
+#
+#   python -m benchmarks.rules --format json --output rules.json
+
+import argparse
+
+from .common import setup_django, measure, get_environment, write_results
+
+setup_django(database=True)
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from validator import Validator  # noqa: E402
+from validator.validators import default_rules  # noqa: E402
+
+LONG = 10000
+
+# rule name : (rule, passing value, failing value, worst case value)
+CASES = {
+    'required': ('required', 'younger', '', ' ' * LONG + 'a'),
+    'accepted': ('accepted', 'yes', 'maybe', 'y' * LONG),
+    'date': ('date', '2020-01-01', '2020-13-01', '9' * LONG),
+    'date_before': ('date_before:2030-01-01', '2020-01-01', '2031-01-01', '2029-12-31'),
+    'date_after': ('date_after:2000-01-01', '2020-01-01', '1990-01-01', '2000-01-02'),
+    'date_range': ('date_range:2000-01-01,2030-01-01', '2020-01-01', '1990-01-01', '2029-12-31'),
+    'datetime': ('datetime', '2020-01-01 10:00:00', '2020-01-01', '9' * LONG),
+    'datetime_before': ('datetime_before:2030-01-01 00:00:00', '2020-01-01 10:00:00', '2031-01-01 10:00:00',
+                        '2029-12-31 23:59:59'),
+    'datetime_after': ('datetime_after:2000-01-01 00:00:00', '2020-01-01 10:00:00', '1990-01-01 10:00:00',
+                       '2000-01-01 00:00:01'),
+    'datetime_range': ('datetime_range:2000-01-01 00:00:00,2030-01-01 00:00:00', '2020-01-01 10:00:00',
+                       '1990-01-01 10:00:00', '2029-12-31 23:59:59'),
+    'active_url': ('active_url', 'localhost', 'not-exists.invalid', 'localhost'),
+    'numberic': ('numberic', '12345', 'abc', '1' * LONG + 'a'),
+    'digits': ('digits', '12345', 'abc', '1' * LONG + 'a'),
+    'regex': ('regex:^[0-9a-z]{3,5}$', 'abc12', '!!', 'a' * LONG),
+    'email': ('email', 'younger@example.com', 'younger', 'a' * LONG + '@'),
+    'min_length': ('min_length:4', 'younger', 'you', 'a' * LONG),
+    'max_length': ('max_length:16', 'younger', 'a' * 17, 'a' * LONG),
+    'ids': ('ids', '1,2,3', '1,,2', '1,' * LONG),
+    'cellphone': ('cellphone', '13811754531', '1381175453', '+8613811754531'),
+    'alphabet': ('alphabet', 'younger', '123', 'a' * LONG),
+    'switch': ('switch:ok,good,awesome', 'ok', 'bad', 'awesome'),
+    'unique': ('unique:AUTH_USER_MODEL,username', 'nobody', 'younger', 'nobody'),
+    'size': ('size:string,5', 'abcde', 'abc', 'a' * LONG),
+    'min': ('min:number,15', '20', '10', '1e308'),
+    'max': ('max:number,50', '20', '60', '-1e308'),
+    'file': ('file:png,jpeg', 'linux.png', 'linux.tgz', 'linux.' + 'a' * LONG),
+    'image': ('image:png', 'linux.png', 'linux.tgz', 'linux.' + 'a' * LONG),
+    'video': ('video:mp4', 'linux.mp4', 'linux.tgz', 'linux.' + 'a' * LONG),
+    'audio': ('audio:mp3', 'linux.mp3', 'linux.tgz', 'linux.' + 'a' * LONG),
+    'attachement': ('attachement:zip', 'linux.zip', 'linux.tgz', 'linux.' + 'a' * LONG),
+    'alpha_dash': ('alpha_dash', 'abc_def', '#%#', 'a' * LONG),
+    'alpha_number': ('alpha_number', 'abc123', '密码', 'a' * LONG),
+    'array': ('array', '1,2,3', 'abc', '1,' * LONG),
+    'date_before_equal': ('date_before_equal:2030-01-01', '2030-01-01', '2031-01-01', '2029-12-31'),
+    'date_after_equal': ('date_after_equal:2000-01-01', '2000-01-01', '1990-01-01', '2000-01-02'),
+    'datetime_before_equal': ('datetime_before_equal:2030-01-01 00:00:00', '2030-01-01 00:00:00',
+                              '2031-01-01 10:00:00', '2029-12-31 23:59:59'),
+    'datetime_after_equal': ('datetime_after_equal:2000-01-01 00:00:00', '2000-01-01 00:00:00',
+                             '1990-01-01 10:00:00', '2000-01-01 00:00:01'),
+    'between': ('between:10,20', '15', '25', 'a' * 15),
+    'boolean': ('boolean', 'true', 'haha', ' ' * LONG + 'true'),
+    'username': ('username', 'younger', '123abc', 'a' + 'b' * LONG),
+    'password': ('password:high', 'ABCdef123!@#', 'abcdef', 'Aa1!' * (LONG // 4)),
+    'ascii': ('ascii', 'abc', '你好', 'a' * LONG),
+    'same': ('same:password', 'abcd1234', '1234abcd', 'a' * LONG),
+    'decimal': ('decimal', '-123.456', 'abc', '1' * LONG + '.'),
+    'exist': ('exist:AUTH_USER_MODEL,username', 'younger', 'nobody', 'younger'),
+    'unique_against': ('unique_against:AUTH_USER_MODEL,username,younger', 'younger', 'bear', 'nobody'),
+    'pascii': ('pascii:true', 'abcdef@123456', chr(555), 'a' * LONG),
+    'unblank': ('unblank', 'abc', ' ' * 3, ' ' * LONG + 'a'),
+    'integer': ('integer', '-12345', 'abc', '1' * LONG + 'a'),
+    'pos_integer': ('pos_integer', '12345', '-12345', '1' * LONG + 'a'),
+    'neg_integer': ('neg_integer', '-12345', '12345', '-' + '1' * LONG + 'a'),
+    'ip_address': ('ip_address', '127.0.0.1', '-10', '2001:0db8:85a3:0000:0000:8a2e:0370:7334'),
+    'percentage': ('percentage', '50', '101', '1' * 4000),
+}
+
+# the file rules check the extensions given by their params
+FILE_RULES = ['file', 'image', 'video', 'audio', 'attachement']
+
+
+def get_rule(rule):
+    validator = type('RuleBenchmark', (Validator,), {'__module__': __name__, 'value': rule})
+    (_, (bound,), _), = validator.plan.bind()
+    return bound
+
+
+def get_value(name, value):
+    if name in FILE_RULES:
+        return SimpleUploadedFile(value, b'benchmark')
+    return value
+
+
+def get_data(name, value):
+    if 'same' == name:
+        return {'password': 'abcd1234', 'value': value}
+    return {'value': value}
+
+
+def run(names=None, min_time=0.2):
+    missing = set(default_rules.keys()) - set(CASES.keys())
+    if missing:
+        raise RuntimeError('no benchmark cases for the rules : {}'.format(', '.join(sorted(missing))))
+
+    results = []
+    for name in names if names else CASES.keys():
+        rule_str, *values = CASES[name]
+        rule = get_rule(rule_str)
+        for case, value in zip(['pass', 'fail', 'worst'], values):
+            value = get_value(name, value)
+            data = get_data(name, value)
+            result = {'rule': name, 'case': case, 'status': rule.check(value, data)}
+            result.update(measure(lambda: rule.check(value, data), min_time=min_time))
+            results.append(result)
+    return results
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='benchmark the rules in default_rules')
+    parser.add_argument('rules', nargs='*', help='names of the rules to benchmark, all the rules by default')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    parser.add_argument('--output', default=None, help='write the results to the file')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to run each case at least')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    results = {'environment': get_environment(), 'rules': run(args.rules, args.min_time)}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            write_results(results, args.format, f)
+    else:
+        write_results(results, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# Project: django-easy-validator
+# File : validators.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# measures Validator.validate end to end with small, medium and large schemas.
+#
+#   python -m benchmarks.validators --format json --output validators.json
+
+import argparse
+
+from .common import setup_django, measure, get_environment, write_results
+
+setup_django()
+
+from validator import Validator  # noqa: E402
+
+
+class SmallValidator(Validator):
+    username = 'required|alpha_dash|min_length:4|max_length:16'
+    password = 'required|password:middle'
+    remember = 'accepted'
+
+
+class MediumValidator(Validator):
+    username = 'required|alpha_dash|min_length:4|max_length:16'
+    password = 'required|password:middle'
+    password_confirm = 'required|same:password'
+    email = 'required|email|max_length:64'
+    cellphone = 'cellphone'
+    birthday = 'date|date_after:1900-01-01|date_before:2030-01-01'
+    age = 'integer|min:number,18|max:number,99'
+    gender = 'switch:male,female'
+    website = 'max_length:128'
+    agreement = 'required|boolean'
+
+
+# the large schema is made of four medium schemas with suffixed field names
+LargeValidator = type('LargeValidator', (Validator,), dict(
+    [('__module__', __name__)] +
+    [('{}_{}'.format(name, i), rule.replace('same:password', 'same:password_{}'.format(i)))
+     for i in range(4) for name, rule in MediumValidator.validation.items()]
+))
+
+# the medium schema with the compiled validation function
+CompiledValidator = type('CompiledValidator', (Validator,), dict(MediumValidator.validation, compiled=True,
+                                                                 __module__=__name__))
+
+SMALL = {
+    'username': 'younger',
+    'password': 'abcDEF123',
+    'remember': 'yes'
+}
+
+MEDIUM = {
+    'username': 'younger',
+    'password': 'abcDEF123',
+    'password_confirm': 'abcDEF123',
+    'email': 'younger@example.com',
+    'cellphone': '13811754531',
+    'birthday': '1990-01-01',
+    'age': '30',
+    'gender': 'male',
+    'website': 'https://github.com/youngershen',
+    'agreement': 'true'
+}
+
+INVALID = {
+    'username': '#you',
+    'password': 'abc',
+    'password_confirm': 'abcDEF123',
+    'remember': 'maybe',
+    'email': 'younger',
+    'cellphone': '1381175453',
+    'birthday': '2031-01-01',
+    'age': '17',
+    'gender': 'unknown',
+    'website': 'w' * 129,
+    'agreement': 'haha'
+}
+
+SCHEMAS = {
+    'small': (SmallValidator, SMALL),
+    'medium': (MediumValidator, MEDIUM),
+    'compiled': (CompiledValidator, MEDIUM),
+    'large': (LargeValidator, dict(('{}_{}'.format(k, i), v) for i in range(4) for k, v in MEDIUM.items())),
+}
+
+
+def get_invalid(data):
+    return dict((k, INVALID[k.rsplit('_', 1)[0] if k not in INVALID else k]) for k in data)
+
+
+def validate_message(validator, data):
+    v = validator(data)
+    v.validate()
+    return v.get_message()
+
+
+def run(names=None, min_time=0.2):
+    results = []
+    for name in names if names else SCHEMAS.keys():
+        validator, data = SCHEMAS[name]
+        for case, values in [('pass', data), ('fail', get_invalid(data))]:
+            status = validator(values).validate()
+            result = {'schema': name, 'fields': len(validator.validation), 'case': case, 'status': status}
+            result.update(measure(lambda: validator(values).validate(), min_time=min_time))
+            results.append(result)
+
+        invalid = get_invalid(data)
+        result = {'schema': name, 'fields': len(validator.validation), 'case': 'fail+message', 'status': False}
+        result.update(measure(lambda: validate_message(validator, invalid), min_time=min_time))
+        results.append(result)
+    return results
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='benchmark Validator.validate end to end')
+    parser.add_argument('schemas', nargs='*', choices=[[]] + list(SCHEMAS.keys()), default=[],
+                        help='the schemas to benchmark, all the schemas by default')
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    parser.add_argument('--output', default=None, help='write the results to the file')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to run each case at least')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    results = {'environment': get_environment(), 'validators': run(args.schemas, args.min_time)}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            write_results(results, args.format, f)
+    else:
+        write_results(results, args.format)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,20 @@
 # WECHAT : 13811754531
 # https://github.com/youngershen/
 
-from io import BytesIO
-from django.test import TestCase
+import os
+import re
+import csv
+import json
+import fnmatch
+import time
+from io import BytesIO, StringIO
+from django.test import TestCase, TransactionTestCase
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from validator import Validator, BaseRule
+from validator import Validator, BaseRule, StatelessRule, RuleProfiler
+from validator.validators import COST_IO, MinLength as MinLengthRule, Email as EmailRule, PatternCache, patterns
+from validator.validators import Unique as UniqueRule, Digits as DigitsRule
+from validator.cli import main
+from validator.metrics import Metrics, metrics_view
 
 
 class AlphaNumber(Validator):
@@ -65,6 +75,25 @@ class TestRuleValidator(Validator):
     name = 'test_rule'
 
 
+class ExpectedRule(StatelessRule):
+    name = 'expected'
+    message = '{VALUE} of {FIELD} is not {EXPECTED}'
+    description = 'just for custom stateless rule test'
+
+    def check_value(self, value, data=None):
+        return value == self.get_arg(0)
+
+    def check_null(self, value, data=None):
+        return True
+
+    def get_message(self, value, data=None):
+        return self.message.format(VALUE=value, FIELD=self.field_name, EXPECTED=self.get_arg(0))
+
+
+class ExpectedValidator(Validator):
+    name = 'expected:test'
+
+
 class Required(Validator):
     username = 'required'
 
@@ -494,6 +523,312 @@ class IPAddress(Validator):
         }
     }
 
+
+class Plan(Validator):
+    username = 'required|min_length: 4'
+    email = 'email'
+
+    message = {
+        'username': {
+            'min_length': '{VALUE} of username is shotter than 4'
+        }
+    }
+
+
+class StripRule(BaseRule):
+    name = 'strip'
+    message = '{FIELD} can not be striped'
+    description = 'just for the data view test, it writes the striped value back to the data'
+
+    def check_value(self):
+        self.data[self.field_name] = self.field_value.strip()
+
+    def check_null(self):
+        pass
+
+
+class StripValidator(Validator):
+    username = 'strip'
+
+
+class DuplicatedRule(StatelessRule):
+    name = 'duplicated'
+    message = '{VALUE} of {FIELD} is duplicated in the batch'
+    description = 'just for the batch validation test'
+    batch = True
+
+    def __init__(self, field_name, args, message=None, duplicated=None):
+        super().__init__(field_name, args, message=message)
+        self.duplicated = duplicated if duplicated else set()
+
+    def check_value(self, value, data=None):
+        return value not in self.duplicated
+
+    def check_null(self, value, data=None):
+        return True
+
+    def prepare(self, values):
+        duplicated = set(value for value in values if values.count(value) > 1)
+        return DuplicatedRule(self.field_name, self.args, message=self.message, duplicated=duplicated)
+
+
+class DuplicatedValidator(Validator):
+    code = 'duplicated'
+
+
+class Bail(Validator):
+    username = 'bail|required|alpha_dash|min_length:4'
+    email = 'required|email'
+
+    message = {
+        'username': {
+            'required': 'username is required',
+            'min_length': 'username is too short'
+        },
+        'email': {
+            'required': 'email is required',
+            'email': 'email is not an email address'
+        }
+    }
+
+
+class Cost(Validator):
+    email = 'unique:AUTH_USER_MODEL,email|email|max_length:16'
+
+    message = {
+        'email': {
+            'unique': 'email is not unique',
+            'email': 'email is not an email address',
+            'max_length': 'email is too long'
+        }
+    }
+
+
+class CostBail(Validator):
+    email = 'bail|unique:AUTH_USER_MODEL,email|email|max_length:16'
+
+
+class CostBailFirst(Validator):
+    email = 'bail|email|max_length:16|unique:AUTH_USER_MODEL,email'
+
+
+class CostBailCompiled(Validator):
+    compiled = True
+    email = 'bail|email|max_length:16|unique:AUTH_USER_MODEL,email'
+
+
+class CostBailPool(Validator):
+    io_workers = 2
+    email = 'bail|unique:AUTH_USER_MODEL,email|email|max_length:16'
+
+
+class SleepRule(BaseRule):
+    name = 'sleep'
+    cost = COST_IO
+    message = '{VALUE} of {FIELD} is bad'
+    description = 'just for the thread pool test, it sleeps like an I/O rule'
+
+    def check_value(self):
+        time.sleep(float(self.args[0]))
+        self.status = self.field_value != 'bad'
+
+    def check_null(self):
+        pass
+
+
+class Sleep(Validator):
+    io_workers = 3
+    first = 'sleep:0.2'
+    second = 'sleep:0.2'
+    third = 'sleep:0.2'
+
+
+class SignupPool(Validator):
+    io_workers = 2
+    username = 'required|unique:AUTH_USER_MODEL,username'
+    email = 'required|email|unique:AUTH_USER_MODEL,email'
+
+
+class InvitePool(Validator):
+    io_workers = 2
+    username = 'unique:AUTH_USER_MODEL,username'
+    inviter = 'exist:AUTH_USER_MODEL,username'
+    first = 'sleep:0'
+
+
+class Profiled(Validator):
+    rule_hook = RuleProfiler()
+    username = 'required|min_length:4'
+    email = 'required|email'
+
+
+class Measured(Validator):
+    metrics = Metrics()
+    username = 'required|min_length:4'
+    email = 'required|email'
+
+
+class Compiled(Validator):
+    compiled = True
+    username = 'required|alpha_dash|min_length:4|max_length:16'
+    email = 'required|email|bail|max_length:20'
+    age = 'integer|percentage'
+    gender = 'switch:male,female'
+
+    message = {
+        'username': {
+            'min_length': '{VALUE} of username is shotter than 4'
+        }
+    }
+
+
+class ShortRule(MinLengthRule):
+    name = 'short'
+    description = 'just for the compiled validator test, it overrides the check of min_length'
+
+    def check_value(self):
+        self.status = len(str(self.field_value)) < int(self.args[0])
+
+
+class LowerRule(BaseRule):
+    name = 'lower'
+    regex = re.compile(r'[a-z]+')
+    message = '{VALUE} of {FIELD} is not lower'
+    description = 'just for the pattern test, its regex is compiled when the class is created'
+
+    def check_value(self):
+        self.status = True if self.regex.fullmatch(self.field_value) else False
+
+    def check_null(self):
+        pass
+
+
+class HexDigitsRule(DigitsRule):
+    name = 'hex_digits'
+    regex = r'[0-9a-f]+'
+    description = 'just for the pattern test, it overrides the compiled regex of digits with a string'
+
+
+class GlobRule(BaseRule):
+    name = 'glob'
+    pattern = '*.txt'
+    message = '{VALUE} of {FIELD} is not a text file'
+    description = 'just for the pattern test, its pattern is a glob which is not compiled as a regex'
+
+    def check_value(self):
+        self.status = fnmatch.fnmatch(self.field_value, self.pattern)
+
+    def check_null(self):
+        pass
+
+
+class Patterns(Validator):
+    code = 'regex:^[0-9]{4}$'
+    name = 'lower'
+
+
+class Globs(Validator):
+    name = 'glob'
+
+
+class HexCodes(Validator):
+    code = 'hex_digits|digits'
+
+
+class Fused(Validator):
+    username = 'required|alpha_dash|username|regex:^[a-z]+$|max_length:16'
+    code = 'integer|decimal|digits|regex:^(1)\\1$'
+    flag = 'regex:^(x)?|regex:^(a)?(?(1)b)c'
+
+
+class Period(Validator):
+    start = 'date|date_after:2020-01-01|date_before:2030-01-01'
+    count = 'min:number,1|max:number,100'
+
+
+class Signup(Validator):
+    username = 'required|unique:AUTH_USER_MODEL,username'
+    email = 'required|email|unique:AUTH_USER_MODEL,email'
+    inviter = 'exist:AUTH_USER_MODEL,username'
+
+
+class BailSignup(Validator):
+    username = 'bail|required|unique:AUTH_USER_MODEL,username'
+    email = 'bail|required|email|unique:AUTH_USER_MODEL,email'
+    inviter = 'exist:AUTH_USER_MODEL,username'
+
+
+class ActiveUniqueRule(UniqueRule):
+    name = 'active_unique'
+    description = 'just for the lookup test, only the active users are counted'
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
+class ActiveSignup(Validator):
+    username = 'active_unique:AUTH_USER_MODEL,username'
+    inviter = 'exist:AUTH_USER_MODEL,username'
+
+
+class CachedLookup(Validator):
+    inviter = 'exist:AUTH_USER_MODEL,username,300'
+    email = 'unique:AUTH_USER_MODEL,email,300'
+    username = 'unique_against:AUTH_USER_MODEL,username,younger,300'
+
+
+class Subscribe(Validator):
+    email = 'required|email|unique:AUTH_USER_MODEL,email'
+
+
+class Unsubscribe(Validator):
+    email = 'required|email|exist:AUTH_USER_MODEL,email'
+
+
+def add_bloom_keys(path, begin, end):
+    # just for the bloom filter test, it adds the keys to a mapped filter in another process
+    from validator.bloom import BloomFilter
+    bloom = BloomFilter.load(path, use_mmap=True)
+    for i in range(begin, end):
+        bloom.add('user{}'.format(i).encode('utf-8'))
+
+
+class StateRule(BaseRule):
+    name = 'state_rule'
+    message = '{VALUE} of {FIELD} has {COUNT} digits'
+    description = 'keeps the digits it counted for the message'
+
+    def check_value(self):
+        self.count = sum(c.isdigit() for c in self.field_value)
+        self.status = self.count == 0
+
+    def check_null(self):
+        pass
+
+    def get_message(self):
+        return self.message.format(VALUE=self.field_value, FIELD=self.field_name, COUNT=self.count)
+
+
+class InitRule(BaseRule):
+    name = 'init_rule'
+    message = '{VALUE} of {FIELD} is not lower'
+    description = 'reads the value when it is built'
+
+    def __init__(self, field_name, field_value, args, data=None, message=None):
+        super().__init__(field_name, field_value, args, data=data, message=message)
+        self.lower = self.field_value.lower()
+
+    def check_value(self):
+        self.status = self.lower == self.field_value
+
+    def check_null(self):
+        pass
+
+
+class StateValidator(Validator):
+    username = 'state_rule|init_rule'
+
+
 # ======================================================================================================================
 
 
@@ -1957,3 +2292,1229 @@ class PrintableASCIINoBlankTestCase(TestCase):
         self.assertFalse(validator.validate())
         message = validator.get_message()
         self.assertDictEqual(message, self.message)
+
+
+class PlanTestCase(TestCase):
+    def setUp(self):
+        self.validator = Plan
+        self.valid_data = {
+            'username': 'younger',
+            'email': 'younger@example.com'
+        }
+        self.invalid_data = {
+            'username': 'you',
+            'email': 'younger@example.com'
+        }
+        self.message = {
+            'username': {
+                'min_length': 'you of username is shotter than 4'
+            }
+        }
+
+    def test_compile(self):
+        fields = self.validator.plan.fields
+        self.assertEqual(['username', 'email'], [field.name for field in fields])
+        rules = fields[0].rules
+        self.assertEqual(['required', 'min_length'], [rule.name for rule in rules])
+        self.assertEqual('4', rules[1].params)
+        self.assertEqual('{VALUE} of username is shotter than 4', rules[1].message)
+
+    def test_reuse(self):
+        self.assertIs(self.validator.plan.bind(), self.validator.plan.bind())
+
+        validator = self.validator(self.valid_data)
+        self.assertTrue(validator.validate())
+
+        validator = self.validator(self.invalid_data)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual(validator.get_message(), self.message)
+
+
+class StatelessRuleTestCase(TestCase):
+    def setUp(self):
+        self.extra_rules = {
+            ExpectedRule.get_name(): ExpectedRule
+        }
+        self.validator = ExpectedValidator
+        self.message = {
+            'name': {
+                'expected': 'toast of name is not test'
+            }
+        }
+        self.valid_data = {
+            'name': 'test',
+        }
+        self.invalid_data = {
+            'name': 'toast'
+        }
+
+    def test_valid(self):
+        validator = self.validator(extra_rules=self.extra_rules, data=self.valid_data)
+        self.assertTrue(validator.validate())
+
+    def test_invalid(self):
+        validator = self.validator(extra_rules=self.extra_rules, data=self.invalid_data)
+        self.assertFalse(validator.validate())
+        message = validator.get_message()
+        self.assertDictEqual(message, self.message)
+
+    def test_adapter(self):
+        (name, (required, min_length), bail), email = Plan.plan.bind()
+        self.assertTrue(min_length.check('younger'))
+        self.assertFalse(min_length.check('you'))
+        self.assertFalse(required.check(''))
+        self.assertEqual('you of username is shotter than 4', min_length.get_message('you'))
+
+        (_, rules, _), _ = Plan.plan.bind()
+        self.assertIs(min_length, rules[1])
+
+
+class DataViewTestCase(TestCase):
+    def setUp(self):
+        self.extra_rules = {
+            StripRule.get_name(): StripRule
+        }
+        self.validator = StripValidator
+        self.data = {
+            'username': ' younger ',
+            'avatar': BytesIO(b'avatar')
+        }
+
+    def test_view(self):
+        validator = self.validator(self.data, extra_rules=self.extra_rules)
+        self.assertIs(validator.get('avatar'), self.data['avatar'])
+        self.assertTrue(validator.validate())
+        self.assertEqual('younger', validator.get('username'))
+        self.assertEqual(' younger ', self.data['username'])
+        self.assertIs(validator.get('avatar'), self.data['avatar'])
+
+    def test_query_dict(self):
+        from django.http import QueryDict
+        data = QueryDict('username= younger &tags=a&tags=b')
+        validator = self.validator(data, extra_rules=self.extra_rules)
+        self.assertTrue(validator.validate())
+        self.assertEqual('younger', validator.get('username'))
+        self.assertEqual(['a', 'b'], validator.data.getlist('tags'))
+        self.assertEqual(' younger ', data.get('username'))
+
+
+class ValidateManyTestCase(TestCase):
+    def setUp(self):
+        self.validator = Plan
+        self.records = [
+            {'username': 'younger', 'email': 'younger@example.com'},
+            {'username': 'you', 'email': 'younger@example.com'},
+            {'username': 'younger', 'email': 'younger'},
+        ]
+        self.message = {
+            1: {
+                'username': {
+                    'min_length': 'you of username is shotter than 4'
+                }
+            },
+            2: {
+                'email': {
+                    'email': 'younger of email is not an email address'
+                }
+            }
+        }
+
+    def test_validate_many(self):
+        results = self.validator.validate_many(self.records)
+        self.assertEqual(3, len(results))
+        self.assertFalse(results.get_status())
+        self.assertEqual([True, False, False], [result.get_status() for result in results])
+        self.assertEqual([1, 2], [result.index for result in results.get_failed()])
+        self.assertDictEqual(self.message, results.get_message())
+        self.assertDictEqual({}, results[0].get_message())
+
+    def test_batch_rule(self):
+        extra_rules = {
+            DuplicatedRule.get_name(): DuplicatedRule
+        }
+        records = [{'code': 'a'}, {'code': 'b'}, {'code': 'a'}]
+        results = DuplicatedValidator.validate_many(records, extra_rules=extra_rules)
+        self.assertEqual([False, True, False], [result.get_status() for result in results])
+        self.assertDictEqual({'code': ['a of code is duplicated in the batch']}, results[2].get_message_plain())
+
+        validator = DuplicatedValidator(records[0], extra_rules=extra_rules)
+        self.assertTrue(validator.validate())
+
+
+class BailTestCase(TestCase):
+    def setUp(self):
+        self.validator = Bail
+        self.valid_data = {
+            'username': 'younger',
+            'email': 'younger@example.com'
+        }
+        self.invalid_data = {
+            'username': '',
+            'email': ''
+        }
+
+    def test_valid(self):
+        validator = self.validator(self.valid_data)
+        self.assertTrue(validator.validate())
+
+    def test_bail(self):
+        validator = self.validator(self.invalid_data)
+        self.assertFalse(validator.validate())
+        message = {
+            'username': {
+                'required': 'username is required'
+            },
+            'email': {
+                'required': 'email is required'
+            }
+        }
+        self.assertDictEqual(message, validator.get_message())
+        self.assertEqual(['required', 'alpha_dash', 'min_length'],
+                         [rule.name for rule in self.validator.plan.fields[0].rules])
+
+    def test_first_error(self):
+        validator = self.validator(self.invalid_data, first_error=True)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'username': ['username is required']}, validator.get_message_plain())
+
+        results = self.validator.validate_many([self.valid_data, self.invalid_data], first_error=True)
+        self.assertEqual([True, False], [result.get_status() for result in results])
+        self.assertDictEqual({'username': ['username is required']}, results[1].get_message_plain())
+
+
+class CostTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.create_user('younger', 'younger.example.com.cn', '123456789')
+
+        self.validator = Cost
+        self.invalid_data = {
+            'email': 'younger.example.com.cn'
+        }
+        self.message = {
+            'email': [
+                'email is not unique',
+                'email is not an email address',
+                'email is too long'
+            ]
+        }
+
+    def test_order(self):
+        (_, rules, _), = self.validator.plan.bind()
+        self.assertEqual(['max_length', 'email', 'unique'], [rule.name for rule in rules])
+
+    def test_message(self):
+        validator = self.validator(self.invalid_data)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual(self.message, validator.get_message_plain())
+
+    def test_bail(self):
+        validator = CostBail(self.invalid_data)
+        with self.assertNumQueries(1):
+            self.assertFalse(validator.validate())
+        self.assertEqual(['unique'], list(validator.get_message()['email'].keys()))
+
+        for validator in (CostBailFirst(self.invalid_data), CostBailFirst(self.invalid_data, first_error=True)):
+            with self.assertNumQueries(0):
+                self.assertFalse(validator.validate())
+            self.assertEqual(['email'], list(validator.get_message()['email'].keys()))
+
+        validator = CostBail({'email': 'younger@example.com.cn'})
+        self.assertFalse(validator.validate())
+        self.assertEqual(['max_length'], list(validator.get_message()['email'].keys()))
+
+    def test_bail_compiled(self):
+        with self.assertNumQueries(0):
+            validator = CostBailCompiled(self.invalid_data)
+            self.assertFalse(validator.validate())
+        self.assertEqual(['email'], list(validator.get_message()['email'].keys()))
+
+    def test_bail_concurrently(self):
+        validator = CostBailPool(self.invalid_data)
+        self.assertFalse(validator.validate())
+        self.assertEqual(['unique'], list(validator.get_message()['email'].keys()))
+
+
+class LazyMessageTestCase(TestCase):
+    def setUp(self):
+        self.validator = Plan
+        self.invalid_data = {
+            'username': 'you',
+            'email': 'younger'
+        }
+
+    def test_lazy(self):
+        from unittest import mock
+        from validator.validators import Email as EmailRule
+
+        with mock.patch.object(EmailRule, 'get_message', return_value='not an email') as get_message:
+            validator = self.validator(self.invalid_data)
+            self.assertFalse(validator.validate())
+            self.assertEqual(0, get_message.call_count)
+            self.assertEqual(['not an email'], validator.get_message_plain()['email'])
+            self.assertDictEqual({'email': 'not an email'}, validator.get_message()['email'])
+            self.assertEqual(1, get_message.call_count)
+
+    def test_set_message(self):
+        validator = self.validator(self.invalid_data)
+        self.assertFalse(validator.validate())
+        validator.set_message('username', 'taken', 'username is taken')
+        message = {
+            'username': ['you of username is shotter than 4', 'username is taken'],
+            'email': ['younger of email is not an email address']
+        }
+        self.assertDictEqual(message, validator.get_message_plain())
+
+    def test_assign(self):
+        # the assigned messages are kept, the messages set later are added to them
+        validator = self.validator(self.invalid_data)
+        validator.validate_message = {'username': {'taken': 'username is taken'}}
+        validator.validate_message_plain = {'username': ['username is taken']}
+        self.assertFalse(validator.validate())
+        validator.set_message('email', 'banned', 'email is banned')
+        self.assertDictEqual({'taken': 'username is taken', 'min_length': 'you of username is shotter than 4'},
+                             validator.get_message()['username'])
+        self.assertDictEqual({'username': ['username is taken', 'you of username is shotter than 4'],
+                              'email': ['younger of email is not an email address', 'email is banned']},
+                             validator.get_message_plain())
+
+
+class AsyncValidateTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        self.user = User.objects.create_user('younger', 'younger@example.com', '123456789')
+
+    async def test_valid(self):
+        validator = Unique({'user_id': str(self.user.pk + 1)})
+        self.assertTrue(await validator.avalidate())
+
+        validator = Exist({'uid': str(self.user.pk)})
+        self.assertTrue(await validator.avalidate())
+
+    async def test_invalid(self):
+        validator = Unique({'user_id': str(self.user.pk)})
+        self.assertFalse(await validator.avalidate())
+        message = {
+            'user_id': {
+                'unique': '{} of AUTH_USER_MODEL with id is not unique'.format(self.user.pk)
+            }
+        }
+        self.assertDictEqual(message, validator.get_message())
+
+        validator = Exist({'uid': 'test'})
+        self.assertFalse(await validator.avalidate())
+
+        validator = ActiveUrl({'url': 'not-exists.invalid'})
+        self.assertFalse(await validator.avalidate())
+
+    async def test_message(self):
+        validator = Cost({'email': 'younger@example.com'})
+        self.assertFalse(await validator.avalidate())
+        self.assertDictEqual({'email': ['email is not unique', 'email is too long']}, validator.get_message_plain())
+
+        validator = Cost({'email': 'younger.example.com.cn'})
+        self.assertFalse(await validator.avalidate())
+        self.assertEqual(['email is not an email address', 'email is too long'],
+                         validator.get_message_plain()['email'])
+
+        validator = CostBail({'email': 'younger.example.com.cn'})
+        self.assertFalse(await validator.avalidate())
+        self.assertEqual(['email'], list(validator.get_message()['email'].keys()))
+
+        validator = CostBailFirst({'email': 'younger.example.com.cn'})
+        self.assertFalse(await validator.avalidate())
+        self.assertEqual(['email'], list(validator.get_message()['email'].keys()))
+
+    async def test_view(self):
+        import json
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from validator import avalidate_view
+
+        @avalidate_view(Plan)
+        async def view(request):
+            return HttpResponse(request.validator.get('username'))
+
+        factory = RequestFactory()
+        response = await view(factory.post('/', {'username': 'younger', 'email': 'younger@example.com'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'younger', response.content)
+
+        response = await view(factory.post('/', {'username': 'you', 'email': 'younger@example.com'}))
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual({'username': {'min_length': 'you of username is shotter than 4'}},
+                             json.loads(response.content))
+
+
+class ThreadPoolTestCase(TransactionTestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.create_user('younger', 'younger@example.com', '123456789')
+        self.extra_rules = {
+            SleepRule.get_name(): SleepRule
+        }
+
+    def test_overlap(self):
+        data = {'first': 'good', 'second': 'bad', 'third': 'good'}
+        validator = Sleep(data, extra_rules=self.extra_rules)
+        begin = time.monotonic()
+        self.assertFalse(validator.validate())
+        self.assertLess(time.monotonic() - begin, 0.5)
+        self.assertDictEqual({'second': ['bad of second is bad']}, validator.get_message_plain())
+
+    def test_unique(self):
+        validator = SignupPool({'username': 'bear', 'email': 'bear@example.com'})
+        self.assertTrue(validator.validate())
+
+        validator = SignupPool({'username': 'younger', 'email': 'younger@example.com'})
+        self.assertFalse(validator.validate())
+        self.assertEqual(['username', 'email'], list(validator.get_message().keys()))
+
+        validator = SignupPool({'username': '', 'email': 'younger'}, first_error=True)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'username': ['username field is required']}, validator.get_message_plain())
+
+    def test_connections(self):
+        import threading
+        from unittest import mock
+
+        threads = []
+        with mock.patch('django.db.close_old_connections', lambda: threads.append(threading.current_thread().name)):
+            validator = Sleep({'first': 'good', 'second': 'bad', 'third': 'good'}, extra_rules=self.extra_rules)
+            self.assertFalse(validator.validate())
+
+        self.assertEqual(3, len(threads))
+        self.assertTrue(all(name.startswith('validator-io') for name in threads))
+
+
+class AtomicThreadPoolTestCase(TestCase):
+    def test_transaction(self):
+        # the test runs in a transaction, the database rules see its records as they are checked by the test
+        import threading
+        from unittest import mock
+        from django.contrib.auth.models import User
+        from validator.validators import default_rules
+        User.objects.create_user('bear', 'bear@example.com', '123456789')
+
+        threads = []
+        check_rule = Validator._check_rule
+
+        def record(validator, rule, name, value):
+            threads.append((rule.name, threading.current_thread().name))
+            return check_rule(validator, rule, name, value)
+
+        with mock.patch.object(Validator, '_check_rule', record):
+            validator = InvitePool({'username': 'bear', 'inviter': 'bear', 'first': 'good'},
+                                   extra_rules=dict(default_rules, sleep=SleepRule))
+            self.assertFalse(validator.validate())
+
+        self.assertEqual(['username'], list(validator.get_message().keys()))
+        self.assertEqual(threading.current_thread().name, dict(threads)['unique'])
+        self.assertEqual(threading.current_thread().name, dict(threads)['exist'])
+        self.assertTrue(dict(threads)['sleep'].startswith('validator-io'))
+
+
+class ParallelTestCase(TestCase):
+    def setUp(self):
+        self.validator = Plan
+        self.records = []
+        for i in range(50):
+            self.records.append({
+                'username': 'younger{}'.format(i) if i % 7 else 'you',
+                'email': 'younger{}@example.com'.format(i) if i % 5 else 'younger'
+            })
+
+    def test_pickle(self):
+        import pickle
+        plan = pickle.loads(pickle.dumps(self.validator.plan))
+        (_, (required, min_length), _), _ = plan.bind()
+        self.assertFalse(min_length.check('you'))
+
+        rule = pickle.loads(pickle.dumps(min_length))
+        self.assertEqual(1, rule.index)
+        self.assertEqual('you of username is shotter than 4', rule.get_message('you'))
+
+    def test_validate_parallel(self):
+        results = self.validator.validate_parallel(self.records, workers=2, chunk_size=8)
+        expected = self.validator.validate_many(self.records)
+        self.assertEqual(list(range(50)), [result.index for result in results])
+        self.assertEqual([result.status for result in expected], [result.status for result in results])
+        self.assertDictEqual(expected.get_message_plain(), results.get_message_plain())
+
+    def test_without_initializer(self):
+        from unittest import mock
+        expected = self.validator.validate_many(self.records)
+        with mock.patch('validator.validators.sys', version_info=(3, 6, 5)):
+            results = self.validator.validate_parallel(self.records, workers=2, chunk_size=8)
+        self.assertDictEqual(expected.get_message_plain(), results.get_message_plain())
+
+
+class ValidateIterTestCase(TestCase):
+    def setUp(self):
+        self.validator = Plan
+
+    def get_records(self, count):
+        for i in range(count):
+            self.read = i + 1
+            yield {
+                'username': 'younger{}'.format(i) if i % 7 else 'you',
+                'email': 'younger{}@example.com'.format(i)
+            }
+
+    def test_validate_iter(self):
+        self.read = 0
+        results = self.validator.validate_iter(self.get_records(100), chunk_size=10)
+        self.assertEqual(0, self.read)
+
+        result = next(results)
+        self.assertEqual(10, self.read)
+        self.assertFalse(result)
+        self.assertDictEqual({'username': ['you of username is shotter than 4']}, result.get_message_plain())
+
+        results = list(results)
+        self.assertEqual(100, self.read)
+        self.assertEqual(list(range(1, 100)), [result.index for result in results])
+        self.assertEqual([i for i in range(1, 100) if not i % 7], [result.index for result in results if not result])
+
+
+class CommandLineTestCase(TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.dir.name, 'report.jsonl')
+        self.records = [
+            {'username': 'younger', 'email': 'younger@example.com'},
+            {'username': 'you', 'email': 'younger@example.com'},
+            {'username': 'younger', 'email': 'younger'}
+        ]
+        self.report = [
+            {'row': 2, 'errors': {'username': ['you of username is shotter than 4']}},
+            {'row': 3, 'errors': {'email': ['younger of email is not an email address']}}
+        ]
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def get_report(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_csv(self):
+        path = os.path.join(self.dir.name, 'users.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['username', 'email'])
+            writer.writeheader()
+            writer.writerows(self.records)
+
+        self.assertEqual(1, main(['tests.tests.Plan', path, '--output', self.output, '--workers', '2']))
+        self.assertEqual(self.report, self.get_report())
+
+    def test_jsonl(self):
+        path = os.path.join(self.dir.name, 'users.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(record) + '\n' for record in self.records)
+
+        self.assertEqual(1, main(['tests.tests.Plan', path, '--output', self.output, '--workers', '1']))
+        self.assertEqual(self.report, self.get_report())
+
+        with open(path, 'w') as f:
+            f.write(json.dumps(self.records[0]) + '\n')
+        self.assertEqual(0, main(['tests.tests.Plan', path, '--output', self.output]))
+        self.assertEqual([], self.get_report())
+
+    def test_malformed(self):
+        # the rows are the lines of the file, the record whose rule raises is reported and the others go on
+        path = os.path.join(self.dir.name, 'users.jsonl')
+        with open(path, 'w') as f:
+            f.write('{"username": \n\n')
+            f.writelines(json.dumps(record) + '\n' for record in self.records)
+            f.write('\n{"username": "younger", "email": 12345}\n[]\n')
+
+        for workers in ('1', '2'):
+            self.assertEqual(1, main(['tests.tests.Plan', path, '--output', self.output, '--workers', workers]))
+            report = self.get_report()
+            self.assertEqual([1, 4, 5, 7, 8], [line['row'] for line in report])
+            self.assertIn('error', report[0])
+            self.assertEqual(self.report[0]['errors'], report[1]['errors'])
+            self.assertEqual(self.report[1]['errors'], report[2]['errors'])
+            self.assertTrue(report[3]['error'].startswith('TypeError: '))
+            self.assertEqual({'row': 8, 'error': 'the line is not a json object'}, report[4])
+
+    def test_format(self):
+        path = os.path.join(self.dir.name, 'users.json')
+        with open(path, 'w') as f:
+            json.dump(self.records, f)
+
+        with self.assertRaises(SystemExit):
+            main(['tests.tests.Plan', path, '--output', self.output])
+
+
+class RuleHookTestCase(TestCase):
+    def test_rule_hook(self):
+        calls = []
+
+        def hook(name, rule, duration, status):
+            calls.append((name, rule, status))
+            self.assertGreaterEqual(duration, 0)
+
+        validator = Plan({'username': 'you', 'email': 'younger@example.com'}, rule_hook=hook)
+        self.assertFalse(validator.validate())
+        self.assertIn(('username', 'min_length', False), calls)
+        self.assertIn(('email', 'email', True), calls)
+
+    def test_async(self):
+        from asgiref.sync import async_to_sync
+        calls = []
+        validator = Plan({'username': 'younger', 'email': 'younger'},
+                         rule_hook=lambda *args: calls.append((args[0], args[1], args[3])))
+        self.assertFalse(async_to_sync(validator.avalidate)())
+        self.assertIn(('email', 'email', False), calls)
+
+    def test_profiler(self):
+        profiler = Profiled.rule_hook
+        profiler.reset()
+        Profiled.validate_many([{'username': 'younger', 'email': 'younger@example.com'},
+                                {'username': 'you', 'email': 'younger'}])
+
+        rules = dict((stat['name'], stat) for stat in profiler.get_stats())
+        self.assertEqual(2, rules['min_length']['count'])
+        self.assertEqual(1, rules['min_length']['failures'])
+        self.assertEqual(1, rules['email']['failures'])
+
+        fields = dict((stat['name'], stat) for stat in profiler.get_stats(by='field'))
+        self.assertEqual(4, fields['email']['count'])
+        self.assertIn('min_length', profiler.report())
+
+        profiler.reset()
+        self.assertEqual([], profiler.get_stats())
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        self.metrics = Measured.metrics
+        self.metrics.reset()
+
+    def test_export(self):
+        self.assertTrue(Measured({'username': 'younger', 'email': 'younger@example.com'}).validate())
+        Measured.validate_many([{'username': 'you', 'email': 'younger'}, {'username': 'you', 'email': 'a@b.cn'}])
+
+        text = self.metrics.export()
+        self.assertIn('validator_validations_total{validator="Measured",status="passed"} 1', text)
+        self.assertIn('validator_validations_total{validator="Measured",status="failed"} 2', text)
+        self.assertIn('validator_failures_total{validator="Measured",field="username",rule="min_length"} 2', text)
+        self.assertIn('validator_failures_total{validator="Measured",field="email",rule="email"} 1', text)
+        self.assertIn('validator_rule_duration_seconds_count{validator="Measured",field="email",rule="email"} 3',
+                      text)
+        self.assertIn('validator_rule_duration_seconds_bucket{validator="Measured",field="email",rule="email",'
+                      'le="+Inf"} 3', text)
+
+    def test_set_message(self):
+        # the failure is counted once, with the validation it belongs to
+        validator = Measured({'username': 'younger', 'email': 'younger@example.com'})
+        validator.set_message('username', 'taken', 'username is taken')
+        validator.validate()
+        self.assertIn('validator_failures_total{validator="Measured",field="username",rule="taken"} 1',
+                      self.metrics.export())
+
+    def test_escape(self):
+        self.metrics.observe_failure('Measured', 'a"b\\c', 'rule')
+        self.assertIn('field="a\\"b\\\\c"', self.metrics.export())
+
+    def test_view(self):
+        from django.test import RequestFactory
+        from validator.metrics import registry
+        registry.observe_validation('Measured', True, [])
+        response = metrics_view(RequestFactory().get('/metrics'))
+        self.assertEqual(200, response.status_code)
+        self.assertIn('text/plain', response['Content-Type'])
+        self.assertIn(b'validator_validations_total{validator="Measured",status="passed"}', response.content)
+        registry.reset()
+
+
+class CompiledTestCase(TestCase):
+    def setUp(self):
+        self.validator = Compiled
+        self.records = [
+            {'username': 'younger', 'email': 'younger@example.com', 'age': '30', 'gender': 'male'},
+            {'username': 'you', 'email': 'younger', 'age': '300', 'gender': 'unknown'},
+            {'username': '#younger', 'email': 'younger@example.com' * 2, 'age': 'abc'},
+            {'username': '', 'email': None, 'age': '-1', 'gender': ''},
+            {}
+        ]
+
+    def get_results(self, **kwargs):
+        results = []
+        for record in self.records:
+            validator = self.validator(record, **kwargs)
+            results.append((validator.validate(), validator.get_message_plain()))
+        return results
+
+    def test_compiled(self):
+        compiled = self.get_results()
+        compiled_first = self.get_results(first_error=True)
+        self.validator.compiled = False
+        try:
+            self.assertEqual(self.get_results(), compiled)
+            self.assertEqual(self.get_results(first_error=True), compiled_first)
+        finally:
+            self.validator.compiled = True
+
+        self.assertTrue(compiled[0][0])
+        self.assertDictEqual({'username': ['you of username is shotter than 4'],
+                              'email': ['younger of email is not an email address'],
+                              'age': ['the give value 300 is for age field is not a positive integer from 0 to 100'],
+                              'gender': ['unknown of gender is not in [male,female]']}, compiled[1][1])
+        self.assertEqual(['younger@example.comyounger@example.com of email is not an email address'],
+                         compiled[2][1]['email'])
+
+    def test_first_error(self):
+        validator = self.validator(self.records[1], first_error=True)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'username': ['you of username is shotter than 4']}, validator.get_message_plain())
+
+    def test_extra_rules(self):
+        from validator.validators import default_rules
+        rules = dict(default_rules, min_length=ShortRule)
+        validator = self.validator({'username': 'younger', 'email': 'younger@example.com'}, extra_rules=rules)
+        self.assertFalse(validator.validate())
+        self.assertIn('min_length', validator.get_message()['username'])
+
+    def test_validate_many(self):
+        results = self.validator.validate_many(self.records)
+        self.assertEqual([True, False, False, False, False], [result.status for result in results])
+
+
+class PatternTestCase(TestCase):
+    def test_compiled(self):
+        self.assertTrue(hasattr(EmailRule.pattern, 'match'))
+        self.assertTrue(hasattr(LowerRule.regex, 'fullmatch'))
+
+        from validator.validators import default_rules
+        rules = dict(default_rules, lower=LowerRule)
+        validator = Patterns({'code': '1234', 'name': 'Younger'}, extra_rules=rules)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'name': ['Younger of name is not lower']}, validator.get_message_plain())
+
+        self.assertEqual('*.txt', GlobRule.pattern)
+        validator = Globs({'name': 'notes.md'}, extra_rules={GlobRule.get_name(): GlobRule})
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'name': ['notes.md of name is not a text file']}, validator.get_message_plain())
+
+    def test_string_regex(self):
+        from validator.validators import default_rules, FusedRule, FusedPattern
+        self.assertTrue(hasattr(HexDigitsRule.regex, 'fullmatch'))
+        self.assertFalse(FusedPattern.can_fuse('[0-9]+'))
+        rules = dict(default_rules, hex_digits=HexDigitsRule)
+        validation = dict((name, rules) for name, rules, _ in HexCodes.plan.bind(rules))
+        self.assertEqual([True, True], [type(rule) is FusedRule for rule in validation['code']])
+        self.assertTrue(HexCodes({'code': '12'}, extra_rules=rules).validate())
+        validator = HexCodes({'code': '1f'}, extra_rules=rules)
+        self.assertFalse(validator.validate())
+        self.assertEqual(['digits'], list(validator.get_message()['code']))
+        validator = HexCodes({'code': '1g'}, extra_rules=rules)
+        self.assertFalse(validator.validate())
+        self.assertEqual(['hex_digits', 'digits'], list(validator.get_message()['code']))
+
+    def test_cache(self):
+        cache = PatternCache(maxsize=2)
+        first = cache.get('a+')
+        self.assertIs(first, cache.get('a+'))
+        cache.get('b+')
+        cache.get('a+')
+        cache.get('c+')
+        self.assertNotIn('b+', cache.patterns)
+        self.assertIn('a+', cache.patterns)
+        self.assertDictEqual({'hits': 2, 'misses': 3, 'size': 2, 'maxsize': 2}, cache.get_stats())
+
+        cache.clear()
+        self.assertDictEqual({'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 2}, cache.get_stats())
+
+    def test_regex_rule(self):
+        from validator.validators import default_rules
+        rules = dict(default_rules, lower=LowerRule)
+        patterns.clear()
+        Patterns.plan.bound.clear()
+        for code in ['1234', '12345', '4321']:
+            Patterns({'code': code}, extra_rules=rules).validate()
+        # the pattern is resolved when the rule is bound, the checks do not look it up in the cache again
+        self.assertEqual(1, patterns.get_stats()['misses'])
+        self.assertEqual(0, patterns.get_stats()['hits'])
+
+
+class FusedTestCase(TestCase):
+    def setUp(self):
+        self.validator = Fused
+
+    def test_fused(self):
+        from validator.validators import FusedRule
+        validation = dict((name, rules) for name, rules, _ in self.validator.plan.bind())
+        self.assertEqual(['required', 'max_length', 'alpha_dash', 'username', 'regex'],
+                         [rule.name for rule in validation['username']])
+        self.assertEqual([False, False, True, True, False],
+                         [type(rule) is FusedRule for rule in validation['username']])
+        # the back reference is not fused
+        self.assertEqual([True, True, True, False], [type(rule) is FusedRule for rule in validation['code']])
+        # the conditional reference is not fused either
+        self.assertEqual([False, False], [type(rule) is FusedRule for rule in validation['flag']])
+
+    def test_message(self):
+        validator = self.validator({'username': 'younger_9', 'code': '11'})
+        self.assertFalse(validator.validate())
+        self.assertDictEqual({'username': ['younger_9 of username is not mathc the pattern ^[a-z]+$']},
+                             validator.get_message_plain())
+
+        validator = self.validator({'username': '_younger', 'code': '1.5'})
+        self.assertFalse(validator.validate())
+        self.assertEqual(['username', 'regex'], list(validator.get_message()['username']))
+        self.assertEqual(['integer', 'digits', 'regex'], list(validator.get_message()['code']))
+
+        self.assertTrue(self.validator({'username': 'younger', 'code': '11', 'flag': 'abc'}).validate())
+        validator = self.validator({'username': 'younger', 'code': '11', 'flag': 'ac'})
+        self.assertFalse(validator.validate())
+        self.assertEqual(['flag'], list(validator.get_message()))
+
+    def test_not_fused(self):
+        from validator.validators import ValidationPlan
+        records = [{'username': 'younger_9', 'code': '11'}, {'username': '_younger', 'code': '1.5'},
+                   {'username': 'Younger', 'code': '0'}, {'username': 'younger', 'code': ''}]
+        fused = [result.get_message() for result in self.validator.validate_many(records)]
+
+        plan = ValidationPlan(self.validator.validation)
+        plan.fuse = False
+        self.validator.plan, origin = plan, self.validator.plan
+        try:
+            self.assertEqual(fused, [result.get_message() for result in self.validator.validate_many(records)])
+        finally:
+            self.validator.plan = origin
+
+
+class ParamSchemaTestCase(TestCase):
+    def get_validator(self, rules):
+        return type('ParamValidator', (Validator,), {'__module__': __name__, 'field': rules})
+
+    def test_invalid(self):
+        from validator.validators import InvalidRuleParamterError, RuleMissedParameterError
+        invalid = [
+            ('min_length:four', InvalidRuleParamterError),
+            ('size:str,5', InvalidRuleParamterError),
+            ('password:strong', InvalidRuleParamterError),
+            ('date_before:1990-13-12', InvalidRuleParamterError),
+            ('datetime_after:1990-12-12 15:31:10,1991-12-12 15:31:10', InvalidRuleParamterError),
+            ('date_range:1990-12-12', RuleMissedParameterError),
+            ('between:1', RuleMissedParameterError)
+        ]
+        for rules, error in invalid:
+            with self.assertRaises(error):
+                self.get_validator(rules)
+
+    def test_extra_rules(self):
+        # the rules replaced by the extra rules are checked with their params when they are bound
+        from validator.validators import RuleMissedParameterError
+        validator = self.get_validator('min_length:4')
+        rules = {'min_length': ExpectedRule}
+        self.assertTrue(validator({'field': '4'}, extra_rules=rules).validate())
+        self.assertFalse(validator({'field': 'four'}, extra_rules=rules).validate())
+
+        validator = self.get_validator('digits')
+        with self.assertRaises(RuleMissedParameterError):
+            validator({'field': '12'}, extra_rules={'digits': MinLengthRule}).validate()
+
+    def test_params(self):
+        import datetime
+        validator = self.get_validator('date_before:1990,%Y,%Y|min:number,15')
+        validation = dict((name, rules) for name, rules, _ in validator.plan.bind())
+        params = [rule.prototype.params for rule in validation['field']]
+        self.assertIn({'type': 'number', 'size': 15.0}, params)
+        self.assertIn({'date': datetime.datetime(1990, 1, 1), 'param_format': '%Y', 'field_format': '%Y'}, params)
+
+        self.assertTrue(validator({'field': '1989'}).validate())
+        self.assertFalse(validator({'field': '1991'}).validate())
+
+
+class ParsedValueTestCase(TestCase):
+    def test_get_parsed(self):
+        from validator.validators import DataView, get_parsed
+        calls = []
+
+        def parse(value, base):
+            calls.append(value)
+            return int(value, base)
+
+        data = DataView({'count': '10'})
+        value = data['count']
+        self.assertEqual(16, get_parsed(data, 'count', value, parse, 16))
+        self.assertEqual(16, get_parsed(data, 'count', value, parse, 16))
+        self.assertEqual(10, get_parsed(data, 'count', value, parse, 10))
+        self.assertEqual(2, len(calls))
+
+        self.assertEqual(16, get_parsed({'count': '10'}, 'count', value, parse, 16))
+        self.assertEqual(3, len(calls))
+
+    def test_shared(self):
+        import datetime
+        validator = Period({'start': '2021-01-01', 'count': '10'})
+        self.assertTrue(validator.validate())
+        self.assertDictEqual({'start': datetime.datetime(2021, 1, 1), 'count': 10.0},
+                             dict((key[0], value) for key, (_, value) in validator.data.parsed.items()))
+
+        validator = Period({'start': '2031-01-01', 'count': '0'})
+        self.assertFalse(validator.validate())
+        self.assertEqual(['start', 'count'], list(validator.get_message()))
+
+
+class DateParserTestCase(TestCase):
+    def test_parse(self):
+        import datetime
+        from validator.validators import parse_datetime
+        cases = [
+            ('2021-03-04', '%Y-%m-%d'), ('2021-3-4', '%Y-%m-%d'), ('2021-02-30', '%Y-%m-%d'),
+            ('2021-03-04 ', '%Y-%m-%d'),
+            ('2021-03-04 10:11:12', '%Y-%m-%d %H:%M:%S'), ('2021-03-04  10:11:12', '%Y-%m-%d %H:%M:%S'),
+            ('2021-03-04 24:11:12', '%Y-%m-%d %H:%M:%S'), ('2021-03-04T10:11:12', '%Y-%m-%d %H:%M:%S'),
+            ('04.03.2021', '%d.%m.%Y'), ('4.3.2021', '%d.%m.%Y'), ('1990', '%Y'), ('199', '%Y'),
+            ('٢٠٢١/03/04', '%Y/%m/%d'), ('Mar 04 2021', '%b %d %Y'), ('', '%Y-%m-%d')
+        ]
+
+        for value, format_str in cases:
+            try:
+                expected = datetime.datetime.strptime(value, format_str)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    parse_datetime(value, format_str)
+            else:
+                self.assertEqual(expected, parse_datetime(value, format_str))
+
+    def test_parser(self):
+        from validator.validators import get_date_parser
+        self.assertIsNone(get_date_parser('%b %d %Y'))
+        self.assertIsNone(get_date_parser('%Y-%Y'))
+        parse = get_date_parser('%d/%m/%Y %H:%M')
+        self.assertEqual((2021, 3, 4, 10, 11), parse('04/03/2021 10:11').timetuple()[:5])
+        self.assertIsNone(parse('4/3/2021 10:11'))
+
+
+class LookupTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.create_user('younger', 'younger@example.com', '123456789')
+
+    def test_one_query(self):
+        with self.assertNumQueries(1):
+            validator = Signup({'username': 'bear', 'email': 'bear@example.com', 'inviter': 'younger'})
+            self.assertTrue(validator.validate())
+
+        with self.assertNumQueries(1):
+            validator = Signup({'username': 'younger', 'email': 'younger@example.com', 'inviter': 'bear'})
+            self.assertFalse(validator.validate())
+        self.assertEqual(['username', 'email', 'inviter'], list(validator.get_message().keys()))
+
+    def test_single_lookup(self):
+        with self.assertNumQueries(1):
+            validator = Signup({'username': 'bear'})
+            self.assertFalse(validator.validate())
+        self.assertDictEqual({}, validator.data.lookups)
+
+    def test_failed_inline(self):
+        # the lookups are resolved after the rules without I/O, only for the fields which are still checked
+        with self.assertNumQueries(0):
+            validator = Signup({'username': '', 'email': 'bear', 'inviter': 'younger'}, first_error=True)
+            self.assertFalse(validator.validate())
+        self.assertEqual(['username'], list(validator.get_message().keys()))
+
+        with self.assertNumQueries(1):
+            validator = BailSignup({'username': 'bear', 'email': 'bear', 'inviter': 'nobody'})
+            self.assertFalse(validator.validate())
+        self.assertEqual(2, len(validator.data.lookups))
+        self.assertDictEqual({'email': ['bear of email is not an email address'],
+                              'inviter': ['nobody of AUTH_USER_MODEL with username  not existis in database']},
+                             validator.get_message_plain())
+
+    def test_own_queryset(self):
+        # a rule with its own queryset is not grouped, it queries the model with its queryset
+        from django.contrib.auth.models import User
+        User.objects.create_user('bear', 'bear@example.com', '123456789', is_active=False)
+        from validator.validators import default_rules
+        rules = dict(default_rules, **{ActiveUniqueRule.get_name(): ActiveUniqueRule})
+        self.assertTrue(ActiveSignup({'username': 'bear'}, extra_rules=rules).validate())
+        with self.assertNumQueries(2):
+            validator = ActiveSignup({'username': 'bear', 'inviter': 'younger'}, extra_rules=rules)
+            self.assertTrue(validator.validate())
+        self.assertDictEqual({}, validator.data.lookups)
+
+    def test_exists(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            Signup({'username': 'younger', 'email': 'bear@example.com'}).validate()
+        self.assertEqual(1, len(queries))
+        self.assertEqual(2, queries[0]['sql'].count('EXISTS'))
+
+    def test_validate_many(self):
+        records = [
+            {'username': 'bear', 'email': 'bear@example.com'},
+            {'username': 'younger', 'email': 'bear@example.com', 'inviter': 'younger'},
+        ]
+        with self.assertNumQueries(3):
+            results = Signup.validate_many(records)
+        self.assertEqual([True, False], [result.status for result in results])
+
+    async def test_avalidate(self):
+        validator = Signup({'username': 'younger', 'email': 'bear@example.com', 'inviter': 'younger'})
+        self.assertFalse(await validator.avalidate())
+        self.assertEqual(2, len(validator.data.lookups))
+        self.assertEqual(['username'], list(validator.get_message().keys()))
+
+
+class BatchLookupTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.create_user('younger', 'younger@example.com', '123456789')
+        User.objects.create_user('bear', 'bear@example.com', '123456789')
+
+    def test_validate_many(self):
+        records = [{'username': 'user{}'.format(i), 'email': 'user{}@example.com'.format(i)} for i in range(1200)]
+        records[10] = {'username': 'younger', 'email': 'younger@example.com', 'inviter': 'bear'}
+        records[20] = {'username': 'user20', 'email': 'user20@example.com', 'inviter': 'nobody'}
+
+        with self.assertNumQueries(7):
+            results = Signup.validate_many(records)
+        self.assertEqual([10, 20], [result.index for result in results.get_failed()])
+        self.assertEqual(['username', 'email'], list(results[10].get_message().keys()))
+        self.assertEqual(['inviter'], list(results[20].get_message().keys()))
+
+    def test_unconverted(self):
+        class Primary(Validator):
+            id = 'exist:AUTH_USER_MODEL,id'
+            name = 'unique:AUTH_USER_MODEL,username__iexact'
+
+        from django.contrib.auth.models import User
+        pk = User.objects.get(username='younger').pk
+        records = [{'id': 'abc', 'name': 'Younger'}, {'id': str(pk), 'name': 'panda'}, {'id': pk + 1000}]
+        results = Primary.validate_many(records)
+        self.assertEqual([False, True, False], [result.status for result in results])
+        self.assertDictEqual({'id': ['abc of AUTH_USER_MODEL with id  not existis in database'],
+                              'name': ['Younger of AUTH_USER_MODEL with username__iexact is not unique']},
+                             results[0].get_message_plain())
+
+    def test_collation(self):
+        # the text fields of a database which may compare them case insensitively are looked up one by one
+        from unittest import mock
+        from django.db import connection
+        from django.contrib.auth.models import User
+        from validator.validators import compares_exactly
+
+        self.assertTrue(compares_exactly(User, User._meta.get_field('username')))
+        self.assertFalse(compares_exactly(User, User._meta.get_field('last_login')))
+        records = [{'username': 'user{}'.format(i), 'email': 'user{}@example.com'.format(i), 'inviter': 'younger'}
+                   for i in range(20)]
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            self.assertFalse(compares_exactly(User, User._meta.get_field('username')))
+            self.assertTrue(compares_exactly(User, User._meta.get_field('id')))
+            # the rules of every record are resolved together by one query
+            with self.assertNumQueries(20):
+                results = Signup.validate_many(records)
+        self.assertEqual([], results.get_failed())
+
+
+class LookupCacheTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user('younger', 'younger@example.com', '123456789')
+
+    def test_cache(self):
+        data = {'inviter': 'younger', 'email': 'bear@example.com', 'username': 'bear'}
+        with self.assertNumQueries(3):
+            self.assertTrue(CachedLookup(data).validate())
+        with self.assertNumQueries(0):
+            self.assertTrue(CachedLookup(data).validate())
+
+        data = {'inviter': 'bear', 'email': 'younger@example.com', 'username': 'younger'}
+        with self.assertNumQueries(3):
+            validator = CachedLookup(data)
+            self.assertFalse(validator.validate())
+        self.assertEqual(['inviter', 'email'], list(validator.get_message().keys()))
+        with self.assertNumQueries(0):
+            self.assertFalse(CachedLookup(data).validate())
+
+    def test_invalidate(self):
+        from django.contrib.auth.models import User
+        self.assertFalse(CachedLookup({'inviter': 'bear'}).validate())
+        self.assertTrue(CachedLookup({'email': 'bear@example.com'}).validate())
+        User.objects.create_user('bear', 'bear@example.com', '123456789')
+        self.assertTrue(CachedLookup({'inviter': 'bear'}).validate())
+        self.assertFalse(CachedLookup({'email': 'bear@example.com'}).validate())
+
+        User.objects.filter(username='bear').get().delete()
+        self.assertFalse(CachedLookup({'inviter': 'bear'}).validate())
+
+    async def test_avalidate(self):
+        validator = CachedLookup({'inviter': 'nobody', 'email': 'younger@example.com'})
+        self.assertFalse(await validator.avalidate())
+        validator = CachedLookup({'inviter': 'nobody', 'email': 'younger@example.com'})
+        self.assertFalse(await validator.avalidate())
+        self.assertEqual(['inviter', 'email'], list(validator.get_message().keys()))
+
+    def test_invalid(self):
+        from validator.validators import InvalidRuleParamterError, RuleMissedParameterError
+        with self.assertRaises(InvalidRuleParamterError):
+            type('CacheValidator', (Validator,), {'__module__': __name__, 'field': 'exist:AUTH_USER_MODEL,id,0'})
+        with self.assertRaises(RuleMissedParameterError):
+            type('CacheValidator', (Validator,), {'__module__': __name__, 'field': 'unique:AUTH_USER_MODEL'})
+
+
+class BloomFilterTestCase(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        User.objects.create_user('younger', 'younger@example.com', '123456789')
+        self.path = os.path.join(os.path.dirname(__file__), 'assets', 'email.bloom')
+
+    def tearDown(self):
+        from django.contrib.auth.models import User
+        from validator.bloom import bloom_filters
+        bloom_filters.unregister(User, 'email')
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_filter(self):
+        from validator.bloom import BloomFilter
+        bloom = BloomFilter.create(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add('user{}'.format(i).encode('utf-8'))
+
+        self.assertTrue(all('user{}'.format(i).encode('utf-8') in bloom for i in range(1000)))
+        positives = sum('other{}'.format(i).encode('utf-8') in bloom for i in range(10000))
+        self.assertLess(positives, 300)
+        self.assertAlmostEqual(0.01, bloom.get_error_rate(), delta=0.005)
+
+        limited = BloomFilter.create(1000, error_rate=0.001, max_bytes=512)
+        self.assertEqual(4096, limited.num_bits)
+
+    def test_unique(self):
+        from django.core.management import call_command
+        from django.contrib.auth.models import User
+        from validator.bloom import bloom_filters
+
+        call_command('build_bloom_filter', 'AUTH_USER_MODEL', 'email', output=self.path, error_rate=0.001,
+                     stdout=StringIO())
+        bloom_filters.load(User, 'email', self.path, use_mmap=True)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(Subscribe({'email': 'bear@example.com'}).validate())
+            results = Subscribe.validate_many([{'email': 'bear@example.com'}, {'email': 'panda@example.com'}])
+            self.assertEqual([True, True], [result.status for result in results])
+        with self.assertNumQueries(1):
+            self.assertFalse(Subscribe({'email': 'younger@example.com'}).validate())
+
+        User.objects.create_user('bear', 'bear@example.com', '123456789')
+        self.assertFalse(Subscribe({'email': 'bear@example.com'}).validate())
+
+    def test_exist(self):
+        # the exist rule queries the values absent from the filter, a stale filter would fail them
+        from django.core.management import call_command
+        from django.contrib.auth.models import User
+        from validator.bloom import bloom_filters
+
+        call_command('build_bloom_filter', 'AUTH_USER_MODEL', 'email', output=self.path, stdout=StringIO())
+        bloom_filters.load(User, 'email', self.path, use_mmap=True)
+        User.objects.bulk_create([User(username='bear', email='bear@example.com')])
+        with self.assertNumQueries(1):
+            self.assertTrue(Unsubscribe({'email': 'bear@example.com'}).validate())
+        with self.assertNumQueries(1):
+            self.assertFalse(Unsubscribe({'email': 'panda@example.com'}).validate())
+
+    def test_memory(self):
+        # a filter loaded into memory misses the values saved by the other processes, it is not used
+        from django.core.management import call_command
+        from django.contrib.auth.models import User
+        from validator.bloom import bloom_filters
+
+        call_command('build_bloom_filter', 'AUTH_USER_MODEL', 'email', output=self.path, stdout=StringIO())
+        bloom_filters.load(User, 'email', self.path)
+        self.assertIsNone(bloom_filters.get(User, 'email'))
+        with self.assertNumQueries(1):
+            self.assertTrue(Subscribe({'email': 'bear@example.com'}).validate())
+
+    def test_key(self):
+        from django.contrib.auth.models import User
+        from validator.bloom import BloomFilters
+        field = User._meta.get_field('id')
+        self.assertEqual(BloomFilters.get_key(User, field, '01'), BloomFilters.get_key(User, field, 1))
+
+    def test_collation(self):
+        from unittest import mock
+        from django.db import connection
+        from django.core.management import call_command, CommandError
+        from django.contrib.auth.models import User
+        from validator.bloom import bloom_filters, BloomFilter
+
+        BloomFilter.create(100).save(self.path)
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaises(CommandError):
+                call_command('build_bloom_filter', 'AUTH_USER_MODEL', 'email', output=self.path, stdout=StringIO())
+
+            # the filter of a field compared without case is not used, the values are queried
+            bloom_filters.load(User, 'email', self.path)
+            with self.assertNumQueries(1):
+                self.assertTrue(Subscribe({'email': 'bear@example.com'}).validate())
+
+    def test_mmap(self):
+        # the processes mapping the file add their values to it under the lock of the file
+        from concurrent.futures import ProcessPoolExecutor
+        from validator.bloom import BloomFilter
+
+        BloomFilter.create(4000, error_rate=0.01).save(self.path)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(add_bloom_keys, self.path, begin, begin + 2000) for begin in (0, 2000)]
+            [future.result() for future in futures]
+
+        bloom = BloomFilter.load(self.path, use_mmap=True)
+        self.assertIsNotNone(bloom.lock_file)
+        self.assertTrue(all('user{}'.format(i).encode('utf-8') in bloom for i in range(4000)))
+        # the count is kept in the header of the file, the values added by both processes are counted
+        self.assertEqual(4000, len(bloom))
+        self.assertEqual(4000, BloomFilter.load(self.path).count)
+        bloom.lock_file.close()
+
+
+class RuleStateTestCase(TestCase):
+    def setUp(self):
+        self.extra_rules = {StateRule.get_name(): StateRule, InitRule.get_name(): InitRule}
+        self.message = {'username': ['Bear42 of username has 2 digits', 'Bear42 of username is not lower']}
+
+    def test_validate(self):
+        validator = StateValidator({'username': 'Bear42'}, extra_rules=self.extra_rules)
+        self.assertFalse(validator.validate())
+        self.assertDictEqual(self.message, validator.get_message_plain())
+        self.assertTrue(StateValidator({'username': 'bear'}, extra_rules=self.extra_rules).validate())
+
+    def test_validate_many(self):
+        records = [{'username': 'Bear42'}, {'username': 'panda7'}, {'username': 'bear'}]
+        results = StateValidator.validate_many(records, extra_rules=self.extra_rules)
+        self.assertEqual([False, False, True], [result.status for result in results])
+        self.assertDictEqual(self.message, results[0].get_message_plain())
+        self.assertDictEqual({'username': ['panda7 of username has 1 digits']}, results[1].get_message_plain())
+
+    def test_avalidate(self):
+        from asgiref.sync import async_to_sync
+        validator = StateValidator({'username': 'Bear42'}, extra_rules=self.extra_rules)
+        self.assertFalse(async_to_sync(validator.avalidate)())
+        self.assertDictEqual(self.message, validator.get_message_plain())
+
+    def test_validate_parallel(self):
+        records = [{'username': 'Bear42'}, {'username': 'bear'}]
+        results = StateValidator.validate_parallel(records, workers=1, extra_rules=self.extra_rules)
+        self.assertDictEqual({0: self.message}, results.get_message_plain())
+
+
+class ReservedFieldTestCase(TestCase):
+    def test_reserved(self):
+        from validator.validators import ReservedFieldError
+        for name in ('bail', 'first_error', 'copy_data', 'io_workers', 'rule_hook', 'compiled', 'metrics'):
+            with self.assertRaises(ReservedFieldError):
+                type('ReservedValidator', (Validator,), {'__module__': __name__, name: 'required'})
+
+        validator = type('OptionValidator', (Validator,), {'__module__': __name__, 'bail': True, 'name': 'email'})
+        self.assertTrue(validator.bail)
+        self.assertEqual(['name'], list(validator.validation))
@@ -7,6 +7,6 @@
 # https://github.com/youngershen/
 
 
-from .validators import Validator, BaseRule
+from .validators import Validator, BaseRule, StatelessRule, RuleProfiler, avalidate_view
 
-__all__ = ['Validator', 'BaseRule']
+__all__ = ['Validator', 'BaseRule', 'StatelessRule', 'RuleProfiler', 'avalidate_view']
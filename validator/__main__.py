@@ -0,0 +1,12 @@
+# Project: django-easy-validator
+# File : __main__.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
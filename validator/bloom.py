@@ -0,0 +1,226 @@
+# Project: django-easy-validator
+# File : bloom.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# bloom filters of the values of model fields, the unique rules skip the query for the values a filter has
+# never seen.
+#
+#   python manage.py build_bloom_filter AUTH_USER_MODEL email --output email.bloom --error-rate 0.001
+#   bloom_filters.load(get_user_model(), 'email', 'email.bloom', use_mmap=True)
+
+import math
+import mmap
+import struct
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # windows, the values added to a mapped filter are only locked in the process
+    fcntl = None
+
+
+class BloomFilter:
+    magic = b'VBF1'
+    header = struct.Struct('<4sQQQ')
+    # the count is the last value of the header
+    count_field = struct.Struct('<Q')
+    count_offset = header.size - count_field.size
+
+    def __init__(self, num_bits, num_hashes, bits=None, count=0, lock_file=None, mapping=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.lock = threading.Lock()
+        self.lock_file = lock_file
+        self.mapping = mapping
+        self._count = count
+
+    @property
+    def mapped(self):
+        return self.mapping is not None
+
+    @property
+    def count(self):
+        # the count of a mapped filter is kept in the header of the file, so it counts the values added by
+        # all the processes mapping it
+        if self.mapping is not None:
+            return self.count_field.unpack_from(self.mapping, self.count_offset)[0]
+        return self._count
+
+    @classmethod
+    def create(cls, capacity, error_rate=0.01, max_bytes=None):
+        # the bits are sized for the capacity and the error rate, the filter gets a higher error rate
+        # when the bits are limited by max_bytes.
+        if not 0 < error_rate < 1:
+            raise ValueError('the error rate must be between 0 and 1')
+
+        capacity = max(int(capacity), 1)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        if max_bytes:
+            num_bits = min(num_bits, int(max_bytes) * 8)
+        num_bits = max(num_bits, 8)
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(num_bits, num_hashes)
+
+    @classmethod
+    def load(cls, path, use_mmap=False):
+        # a mapped filter shares its bits with the other processes mapping the same file, the values added
+        # by one of them are seen by all of them. the bytes of the file are updated under a lock of the file,
+        # so the bits set by two processes at once are not lost.
+        with open(path, 'r+b' if use_mmap else 'rb') as f:
+            magic, num_bits, num_hashes, count = cls.header.unpack(f.read(cls.header.size))
+            if magic != cls.magic:
+                raise ValueError('{} is not a bloom filter file'.format(path))
+
+            if use_mmap:
+                mapping = memoryview(mmap.mmap(f.fileno(), 0))
+                bits = mapping[cls.header.size:]
+            else:
+                mapping, bits = None, bytearray(f.read())
+
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError('{} is a truncated bloom filter file'.format(path))
+        if not use_mmap:
+            return cls(num_bits, num_hashes, bits, count)
+        return cls(num_bits, num_hashes, bits, count, open(path, 'rb'), mapping)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.header.pack(self.magic, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+
+    def add(self, key):
+        positions = self.get_positions(key)
+        with self.lock:
+            if self.lock_file is not None and fcntl is not None:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+            try:
+                for position in positions:
+                    self.bits[position >> 3] |= 1 << (position & 7)
+                if self.mapping is not None:
+                    self.count_field.pack_into(self.mapping, self.count_offset, self.count + 1)
+                else:
+                    self._count += 1
+            finally:
+                if self.lock_file is not None and fcntl is not None:
+                    fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(key))
+
+    def __len__(self):
+        return self.count
+
+    def get_positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def get_error_rate(self):
+        # the expected false positive rate with the values added so far
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def get_stats(self):
+        return {'count': self.count, 'bits': self.num_bits, 'hashes': self.num_hashes,
+                'bytes': len(self.bits), 'error_rate': self.get_error_rate()}
+
+
+# the bloom filters of the model fields used by the unique rules, the values of the saved records are added
+# to the filters of their models by post_save. the records written without the signal, by bulk_create,
+# update, raw sql or the processes which have not loaded the filter, are missed until it is built again.
+class BloomFilters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filters = {}
+
+    def register(self, model, field_name, bloom):
+        from django.db.models.signals import post_save
+        from .validators import compares_exactly
+
+        # the filter of a field which the database compares another way than python, such as without case,
+        # or a filter loaded into memory, which misses the values saved by the other processes, is kept but
+        # not used, the values of the field are queried.
+        field = model._meta.get_field(field_name)
+        with self.lock:
+            used = bloom.mapped and compares_exactly(model, field)
+            self.filters[(model, field_name)] = (field, bloom if used else None)
+            post_save.connect(self.update, sender=model, weak=False,
+                              dispatch_uid='validator.bloom.{}'.format(model._meta.label_lower))
+        return bloom
+
+    def load(self, model, field_name, path, use_mmap=False):
+        return self.register(model, field_name, BloomFilter.load(path, use_mmap=use_mmap))
+
+    def unregister(self, model, field_name):
+        with self.lock:
+            self.filters.pop((model, field_name), None)
+
+    def get(self, model, field_name):
+        item = self.filters.get((model, field_name), None)
+        return item[1] if item else None
+
+    def is_absent(self, model, field_name, value):
+        # only the values the filter has never seen are absent, the others may be in the table
+        item = self.filters.get((model, field_name), None)
+        if item is None or item[1] is None:
+            return False
+
+        field, bloom = item
+        try:
+            key = self.get_key(model, field, value)
+        except (ValueError, TypeError):
+            return False
+        return key not in bloom
+
+    def update(self, sender, instance, **kwargs):
+        for (model, _), (field, bloom) in list(self.filters.items()):
+            if model is sender and bloom is not None:
+                value = getattr(instance, field.attname)
+                if value is None:
+                    continue
+
+                try:
+                    bloom.add(self.get_key(model, field, value))
+                except (ValueError, TypeError):
+                    continue
+
+    @staticmethod
+    def get_key(model, field, value):
+        # the values are converted to the values the database compares, so the given values and the values
+        # of the records give the same keys.
+        from django.db import connections, router
+        from django.core.exceptions import ValidationError
+        try:
+            value = field.get_db_prep_value(field.to_python(value), connections[router.db_for_read(model)])
+        except ValidationError as e:
+            raise ValueError(e)
+        return str(value).encode('utf-8')
+
+
+bloom_filters = BloomFilters()
+
+
+def build(model, field_name, error_rate=0.01, max_bytes=None, capacity=None, chunk_size=10000):
+    # the capacity defaults to twice the records, so the filter keeps its error rate while the records
+    # saved after the build are added to it.
+    from .validators import compares_exactly
+
+    field = model._meta.get_field(field_name)
+    if not compares_exactly(model, field):
+        raise ValueError('the database does not compare {} like python, it can not use a bloom filter'.format(
+            field_name))
+
+    qs = model.objects.exclude(**{field_name + '__isnull': True}).values_list(field_name, flat=True)
+    if capacity is None:
+        capacity = qs.count() * 2
+
+    bloom = BloomFilter.create(capacity, error_rate=error_rate, max_bytes=max_bytes)
+    for value in qs.iterator(chunk_size=chunk_size):
+        bloom.add(BloomFilters.get_key(model, field, value))
+    return bloom
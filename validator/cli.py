@@ -0,0 +1,190 @@
+# Project: django-easy-validator
+# File : cli.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# validates a csv or json-lines file with a Validator class and writes the failed records as json lines.
+#
+#   python -m validator myapp.validators.ImportValidator users.csv --workers 8 --output report.jsonl
+
+import os
+import sys
+import csv
+import json
+import argparse
+import importlib
+from collections import deque
+
+FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl'
+}
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog='python -m validator',
+                                     description='validate the records of a csv or json-lines file.')
+    parser.add_argument('validator', help='dotted path of the Validator class, such as myapp.validators.Import')
+    parser.add_argument('file', help='the csv or json-lines file to validate, - for the standard input')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                        help='format of the file, it is guessed from the file extension by default')
+    parser.add_argument('--output', default='-', help='the json-lines report of the failed records')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='number of records validated at once')
+    parser.add_argument('--delimiter', default=',', help='the delimiter of the csv file')
+    parser.add_argument('--encoding', default='utf-8', help='the encoding of the file')
+    parser.add_argument('--first-error', action='store_true', help='only report the first error of a record')
+    parser.add_argument('--settings', default=None, help='the django settings module')
+    return parser
+
+
+def setup_django(settings_module=None):
+    if settings_module:
+        os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+
+    try:
+        import django
+        from django.conf import settings
+    except ImportError:
+        return
+
+    if os.environ.get('DJANGO_SETTINGS_MODULE', None):
+        django.setup()
+    elif not settings.configured:
+        settings.configure(USE_I18N=False)
+
+
+def get_validator(path):
+    from .validators import Validator
+
+    module_name, _, class_name = path.rpartition('.')
+    if not module_name:
+        raise ValueError('{} is not a dotted path of a Validator class'.format(path))
+
+    validator = getattr(importlib.import_module(module_name), class_name, None)
+    if not isinstance(validator, type) or not issubclass(validator, Validator):
+        raise ValueError('{} is not a Validator class'.format(path))
+    return validator
+
+
+def get_format(path, file_format=None):
+    if file_format:
+        return file_format
+
+    if '-' == path:
+        return 'jsonl'
+
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError('unknown format of {}, please set it with --format'.format(path))
+    return FORMATS[ext]
+
+
+def read_csv(f, delimiter=','):
+    return csv.DictReader(f, delimiter=delimiter)
+
+
+def read_jsonl(f, errors=None, rows=None):
+    # the rows are the line numbers of the file. the lines which are not json objects are left out of the
+    # records, their rows and the parse errors are put into errors to be reported with the failed records, and
+    # the rows of the records are put into rows.
+    for row, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            if errors is None:
+                raise
+            errors.append((row, str(e)))
+            continue
+
+        if not isinstance(record, dict):
+            if errors is None:
+                raise ValueError('the line {} is not a json object'.format(row))
+            errors.append((row, 'the line is not a json object'))
+            continue
+
+        if rows is not None:
+            rows.append(row)
+        yield record
+
+
+def validate(validator, records, workers=1, chunk_size=1000, first_error=False):
+    # the exceptions raised by the rules of a record are reported with the record and the others go on
+    if workers > 1:
+        return validator.iter_parallel(records, workers=workers, chunk_size=chunk_size, first_error=first_error,
+                                       catch_errors=True)
+    else:
+        return validator.validate_iter(records, chunk_size=chunk_size, first_error=first_error, catch_errors=True)
+
+
+def write_report(results, output, errors=(), rows=None):
+    # the rows of the records are given by rows, or counted. the parse errors are in the order of their rows,
+    # they are written before the first record after them.
+    total = 0
+    failed = 0
+    for result in results:
+        row = rows.popleft() if rows is not None else total + 1
+        while errors and errors[0][0] < row:
+            write_error(output, *errors.popleft())
+            total = total + 1
+            failed = failed + 1
+
+        total = total + 1
+        if result.error is not None:
+            failed = failed + 1
+            write_error(output, row, result.error)
+        elif not result:
+            failed = failed + 1
+            report = {'row': row, 'errors': result.get_message_plain()}
+            output.write(json.dumps(report, ensure_ascii=False, default=str) + '\n')
+
+    while errors:
+        write_error(output, *errors.popleft())
+        total = total + 1
+        failed = failed + 1
+    return total, failed
+
+
+def write_error(output, row, error):
+    output.write(json.dumps({'row': row, 'error': error}, ensure_ascii=False) + '\n')
+
+
+def open_file(path, mode, encoding):
+    if '-' == path:
+        return sys.stdin if 'r' == mode else sys.stdout
+    return open(path, mode, encoding=encoding, newline='' if 'r' == mode else None)
+
+
+def main(argv=None):
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    setup_django(args.settings)
+
+    try:
+        validator = get_validator(args.validator)
+        file_format = get_format(args.file, args.format)
+    except (ImportError, ValueError) as e:
+        parser.error(str(e))
+
+    source = open_file(args.file, 'r', args.encoding)
+    output = open_file(args.output, 'w', 'utf-8')
+    try:
+        errors = deque()
+        rows = None if 'csv' == file_format else deque()
+        records = read_csv(source, args.delimiter) if 'csv' == file_format else read_jsonl(source, errors, rows)
+        results = validate(validator, records, args.workers, args.chunk_size, args.first_error)
+        total, failed = write_report(results, output, errors, rows)
+    finally:
+        for f in (source, output):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+
+    sys.stderr.write('{} records checked, {} records failed.\n'.format(total, failed))
+    return 1 if failed else 0
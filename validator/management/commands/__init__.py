@@ -0,0 +1,5 @@
+# Project: django-easy-validator
+# File : __init__.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
@@ -0,0 +1,53 @@
+# Project: django-easy-validator
+# File : build_bloom_filter.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# builds the bloom filter of a model field from its records and writes it to a file.
+#
+#   python manage.py build_bloom_filter AUTH_USER_MODEL email --output email.bloom --max-memory 64M
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from validator.bloom import build
+from validator.validators import Unique
+
+UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def get_size(value):
+    value = value.strip().upper()
+    if value and value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+class Command(BaseCommand):
+    help = 'build the bloom filter of a model field for the unique rules.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='the model, such as app.Model or AUTH_USER_MODEL')
+        parser.add_argument('field', help='the field of the model')
+        parser.add_argument('--output', required=True, help='the file the bloom filter is written to')
+        parser.add_argument('--error-rate', type=float, default=0.01, help='the false positive rate')
+        parser.add_argument('--max-memory', type=get_size, default=None,
+                            help='the size limit of the filter, such as 512K, 64M or 1G')
+        parser.add_argument('--capacity', type=int, default=None,
+                            help='the number of values the filter is sized for, twice the records by default')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='number of records read at once')
+
+    def handle(self, *args, **options):
+        try:
+            model = Unique.get_model(options['model'])
+            bloom = build(model, options['field'], error_rate=options['error_rate'],
+                          max_bytes=options['max_memory'], capacity=options['capacity'],
+                          chunk_size=options['chunk_size'])
+        except (LookupError, ValueError, FieldDoesNotExist) as e:
+            raise CommandError(e)
+
+        bloom.save(options['output'])
+        stats = bloom.get_stats()
+        self.stdout.write('{} values, {} bytes, {} hashes, expected error rate {:.6f}'.format(
+            stats['count'], stats['bytes'], stats['hashes'], stats['error_rate']))
@@ -0,0 +1,120 @@
+# Project: django-easy-validator
+# File : metrics.py
+# Author: Younger Shen <申延刚>
+# Web: https://github.com/youngershen
+# Email : shenyangang@163.com
+#
+# in process counters and histograms of the validations, exported in the prometheus text format.
+#
+#   class SignupValidator(Validator):
+#       metrics = registry
+
+import threading
+
+# the upper bounds of the rule duration buckets in seconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metrics:
+    def __init__(self, buckets=BUCKETS, prefix='validator'):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.validations = {}
+        self.failures = {}
+        self.durations = {}
+
+    def get_rule_hook(self, validator_name):
+        def hook(name, rule_name, duration, status):
+            self.observe_rule(validator_name, name, rule_name, duration)
+        return hook
+
+    def observe_rule(self, validator_name, name, rule_name, duration):
+        key = (validator_name, name, rule_name)
+        with self.lock:
+            histogram = self.durations.get(key, None)
+            if histogram is None:
+                self.durations[key] = histogram = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += duration
+
+    def observe_validation(self, validator_name, status, failures):
+        key = (validator_name, 'passed' if status else 'failed')
+        with self.lock:
+            self.validations[key] = self.validations.get(key, 0) + 1
+            for name, rule_name, _, _ in failures:
+                self._add_failure(validator_name, name, rule_name)
+
+    def observe_failure(self, validator_name, name, rule_name):
+        with self.lock:
+            self._add_failure(validator_name, name, rule_name)
+
+    def _add_failure(self, validator_name, name, rule_name):
+        key = (validator_name, name, rule_name)
+        self.failures[key] = self.failures.get(key, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.validations = {}
+            self.failures = {}
+            self.durations = {}
+
+    def export(self):
+        with self.lock:
+            validations = sorted(self.validations.items())
+            failures = sorted(self.failures.items())
+            durations = sorted((key, (list(counts), count, total)) for key, (counts, count, total)
+                               in self.durations.items())
+
+        lines = []
+        name = self.prefix + '_validations_total'
+        lines.extend(self._get_header(name, 'counter', 'Validations run.'))
+        for (validator_name, status), value in validations:
+            lines.append(self._get_sample(name, value, validator=validator_name, status=status))
+
+        name = self.prefix + '_failures_total'
+        lines.extend(self._get_header(name, 'counter', 'Failed rules by validator, field and rule.'))
+        for (validator_name, field, rule), value in failures:
+            lines.append(self._get_sample(name, value, validator=validator_name, field=field, rule=rule))
+
+        name = self.prefix + '_rule_duration_seconds'
+        lines.extend(self._get_header(name, 'histogram', 'Duration of the rule checks in seconds.'))
+        for (validator_name, field, rule), (counts, count, total) in durations:
+            labels = {'validator': validator_name, 'field': field, 'rule': rule}
+            for bound, value in zip(self.buckets, counts):
+                lines.append(self._get_sample(name + '_bucket', value, **labels, le=repr(bound)))
+            lines.append(self._get_sample(name + '_bucket', count, **labels, le='+Inf'))
+            lines.append(self._get_sample(name + '_sum', total, **labels))
+            lines.append(self._get_sample(name + '_count', count, **labels))
+
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _get_header(name, metric_type, description):
+        return ['# HELP {} {}'.format(name, description), '# TYPE {} {}'.format(name, metric_type)]
+
+    @staticmethod
+    def _get_sample(name, value, **labels):
+        labels = ','.join('{}="{}"'.format(key, Metrics._escape(value)) for key, value in labels.items())
+        return '{}{{{}}} {}'.format(name, labels, value)
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Metrics()
+
+
+def export(metrics=None):
+    return (metrics if metrics else registry).export()
+
+
+def metrics_view(request):
+    from django.http import HttpResponse
+    return HttpResponse(export(), content_type=CONTENT_TYPE)
@@ -6,10 +6,24 @@
 # WECHAT : 13811754531
 # https://github.com/youngershen/
 
+import os
 import re
+import sys
+import time
+import uuid
 import socket
+import hashlib
+import asyncio
 import datetime
-from copy import deepcopy
+import functools
+import threading
+from collections import deque, OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections.abc import MutableMapping
+from copy import copy, deepcopy
+
+from .bloom import bloom_filters
 
 try:
     # django not installed
@@ -27,6 +41,13 @@ else:
             return text
 
 
+# the relative costs of the rules, the rules of a field are checked from the cheapest one
+COST_PURE = 0
+COST_REGEX = 1
+COST_PARSE = 2
+COST_IO = 3
+
+
 class RuleNotFoundError(Exception):
     message = _('{NAME} rule not found !!!')
 
@@ -45,16 +66,263 @@ class InvalidRuleParamterError(Exception):
     pass
 
 
+class ReservedFieldError(Exception):
+    message = _('{NAME} is an option of the validator, it can not be a field')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.message.format(NAME=self.name)
+
+
+# a typed param of a rule, the params of the rules are parsed once when the rules are bound
+class Param:
+    __slots__ = ('name', 'parse', 'default', 'required')
+
+    def __init__(self, name, parse=str, default=None, required=False):
+        self.name = name
+        self.parse = parse
+        self.default = default
+        self.required = required
+
+
+def one_of(*choices):
+    def parse(value):
+        if value not in choices:
+            raise ValueError('{} is not one of {}'.format(value, ', '.join(choices)))
+        return value
+    return parse
+
+
+# the widths of the numeric directives, the formats made of them and punctuations are parsed by positions
+DATE_DIRECTIVES = {'Y': 4, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+
+
+def _parse_iso_date(value):
+    if len(value) == 10 and '-' == value[4] == value[7]:
+        return datetime.datetime.fromisoformat(value)
+    return None
+
+
+def _parse_iso_datetime(value):
+    if len(value) == 19 and '-' == value[4] == value[7] and ' ' == value[10] and ':' == value[13] == value[16]:
+        return datetime.datetime.fromisoformat(value)
+    return None
+
+
+def get_date_parser(format_str):
+    # builds a parser of the values in the format, the parser returns None for the values it leaves to
+    # strptime. there is no parser for the formats with other directives than the numeric ones.
+    fields = []
+    separators = []
+    position = 0
+    index = 0
+    while index < len(format_str):
+        char = format_str[index]
+        if '%' == char:
+            directive = format_str[index + 1:index + 2]
+            if directive not in DATE_DIRECTIVES or any(directive == field[0] for field in fields):
+                return None
+            fields.append((directive, position, position + DATE_DIRECTIVES[directive]))
+            position = position + DATE_DIRECTIVES[directive]
+            index = index + 2
+        elif char.isalnum():
+            return None
+        else:
+            separators.append((position, char))
+            position = position + 1
+            index = index + 1
+
+    length = position
+
+    def parse(value):
+        if len(value) != length:
+            return None
+
+        for at, separator in separators:
+            if value[at] != separator:
+                return None
+
+        parts = {'Y': 1900, 'm': 1, 'd': 1, 'H': 0, 'M': 0, 'S': 0}
+        for directive, start, end in fields:
+            part = value[start:end]
+            # str.isascii is missed before python 3.7 and str.isdigit takes the other digits
+            if not all('0' <= char <= '9' for char in part):
+                return None
+            parts[directive] = int(part)
+
+        return datetime.datetime(parts['Y'], parts['m'], parts['d'], parts['H'], parts['M'], parts['S'])
+
+    return parse
+
+
+date_parsers = {}
+if hasattr(datetime.datetime, 'fromisoformat'):
+    date_parsers.update({'%Y-%m-%d': _parse_iso_date, '%Y-%m-%d %H:%M:%S': _parse_iso_datetime})
+
+
+def parse_datetime(value, format_str):
+    # the values the fast parsers can not parse, or parse to an invalid date, are parsed by strptime,
+    # so the results and the errors are the same as the ones of strptime.
+    parser = date_parsers.get(format_str, None)
+    if parser is None:
+        parser = date_parsers[format_str] = get_date_parser(format_str) or False
+
+    if parser and type(value) is str:
+        try:
+            result = parser(value)
+        except ValueError:
+            result = None
+
+        if result is not None:
+            return result
+
+    return datetime.datetime.strptime(value, format_str)
+
+
+# the values parsed by the rules of a field are kept by the data view of the validation, so the other
+# rules of the field get them without parsing the value again, the values failed to parse are not kept.
+def get_parsed(data, name, value, parse, *args):
+    parsed = getattr(data, 'parsed', None)
+    if parsed is None:
+        return parse(value, *args)
+
+    key = (name, parse) + args
+    cached = parsed.get(key, None)
+    if cached is not None and cached[0] is value:
+        return cached[1]
+
+    result = parse(value, *args)
+    parsed[key] = (value, result)
+    return result
+
+
+# the compiled patterns of the regex rule params, the least recently used ones are dropped
+# when there are more than maxsize of them.
+class PatternCache:
+    # the type of the compiled patterns, re.Pattern is only there since python 3.7
+    type = type(re.compile(''))
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.patterns = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, regex):
+        with self.lock:
+            pattern = self.patterns.get(regex, None)
+            if pattern is not None:
+                self.patterns.move_to_end(regex)
+                self.hits += 1
+                return pattern
+
+        pattern = re.compile(regex)
+        with self.lock:
+            self.misses += 1
+            self.patterns[regex] = pattern
+            while len(self.patterns) > self.maxsize:
+                self.patterns.popitem(last=False)
+        return pattern
+
+    def get_stats(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.patterns), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self.lock:
+            self.patterns.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+patterns = PatternCache()
+
+
+# keeps the results of the cached database rules in a django cache, the results of a model are dropped together
+# by a new version of the model when one of its records is saved or deleted.
+class LookupCache:
+    def __init__(self, alias='default', prefix='validator.lookup'):
+        self.alias = alias
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.models = set()
+
+    def get_cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, model, key, query, timeout):
+        self.watch(model)
+        cache = self.get_cache()
+        version_key = self.get_version_key(model)
+        version = cache.get(version_key, None)
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, None)
+            version = cache.get(version_key, None)
+
+        key = '{}.{}.{}'.format(version_key, version, hashlib.sha1(repr(key).encode('utf-8')).hexdigest())
+        exists = cache.get(key, None)
+        if exists is None:
+            exists = True if query() else False
+            cache.set(key, exists, timeout)
+        return exists
+
+    def watch(self, model):
+        if model in self.models:
+            return
+
+        from django.db.models.signals import post_save, post_delete
+        with self.lock:
+            if model not in self.models:
+                dispatch_uid = self.get_version_key(model)
+                post_save.connect(self.invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+                post_delete.connect(self.invalidate, sender=model, weak=False, dispatch_uid=dispatch_uid)
+                self.models.add(model)
+
+    def invalidate(self, sender, using=None, **kwargs):
+        # the version is changed again when the transaction is committed, so the results cached by the other
+        # connections before the commit are dropped too.
+        from django.db import transaction
+        self.clear(sender)
+        transaction.on_commit(lambda: self.clear(sender), using=using)
+
+    def clear(self, model):
+        self.get_cache().set(self.get_version_key(model), uuid.uuid4().hex, None)
+
+    def get_version_key(self, model):
+        return '{}.{}'.format(self.prefix, model._meta.label_lower)
+
+
+lookup_cache = LookupCache()
+
+
 class BaseRule:
     name = 'base_rule'
     message = _('{VALUE} of {FIELD} field is match rule {RULE_NAME}.')
     description = _('describe the propuse of the current rule.')
     parse_args = True
+    param_schema = None
+    batch = False
+    database = False
+    cost = COST_PURE
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the built in rules keep their patterns compiled, a subclass which overrides one of them with a string
+        # gets it compiled too, the other string attributes of the custom rules are left as they are.
+        for name in ('regex', 'pattern'):
+            value = vars(cls).get(name, None)
+            if isinstance(value, str) and isinstance(getattr(super(cls, cls), name, None), PatternCache.type):
+                setattr(cls, name, patterns.get(value))
 
     def __init__(self, field_name, field_value, args, data=None, message=None):
         self.field_name = field_name
         self.field_value = field_value
-        self.args = list(map(lambda d: d.strip(), args.split(','))) if self.parse_args else args
+        self.args = self.get_args(args)
+        self.params = self.parse_params(self.args)
         self.status = True
         self.message = message if message else self.message
         self.data = data
@@ -65,9 +333,18 @@ class BaseRule:
         else:
             self.check_null()
 
+    async def acheck(self):
+        if self.field_value:
+            await self.acheck_value()
+        else:
+            self.check_null()
+
     def check_value(self):
         raise NotImplementedError()
 
+    async def acheck_value(self):
+        self.check_value()
+
     def check_null(self):
         raise NotImplementedError()
 
@@ -77,17 +354,253 @@ class BaseRule:
     def get_message(self):
         return self.message.format(FIELD=self.field_name, VALUE=self.field_value, RULE_NAME=self.name)
 
+    def prepare(self, values):
+        # rules with the batch flag return a stateless rule, or a copy of themselves, which checks the
+        # given values of a whole batch of records, or None to check them one by one.
+        return None
+
+    def get_inline(self):
+        # returns an expression of value which checks it like the rule, and the constants the expression
+        # refers with {NAME}, the compiled validators inline it instead of calling the rule.
+        return None
+
+    def get_pattern(self):
+        # returns the compiled pattern which the not empty values must match, whether the whole value must
+        # match it and whether the value is converted to a string first, the patterns of a field are fused.
+        return None
+
+    def get_lookup(self):
+        # returns the (model, field, value) the rule looks up in the database, the lookups of a validation on
+        # the same model are resolved together by one query.
+        return None
+
+    def get_args(self, args):
+        if isinstance(args, tuple) or not self.parse_args:
+            return args
+        return list(map(lambda d: d.strip(), args.split(',')))
+
     def get_arg(self, index):
         if len(self.args) > index:
             return self.args[index]
         else:
             return None
 
+    def parse_value(self, parse, *args):
+        return get_parsed(self.data, self.field_name, self.field_value, parse, *args)
+
+    @classmethod
+    def parse_params(cls, args):
+        if cls.param_schema is None:
+            return None
+
+        if len(args) > len(cls.param_schema) and any(args[len(cls.param_schema):]):
+            raise InvalidRuleParamterError(_('{} rule takes {} params at most').format(
+                cls.name, len(cls.param_schema)))
+
+        params = {}
+        for index, param in enumerate(cls.param_schema):
+            value = args[index] if len(args) > index else None
+            if not value:
+                if param.required:
+                    raise RuleMissedParameterError(_('{} rule missed the {} param').format(cls.name, param.name))
+                params[param.name] = param.default
+                continue
+
+            try:
+                params[param.name] = param.parse(value)
+            except (TypeError, ValueError) as e:
+                raise InvalidRuleParamterError(_('invalid {} param {} of {} rule: {}').format(
+                    param.name, value, cls.name, e))
+
+        try:
+            return cls.clean_params(params)
+        except (TypeError, ValueError) as e:
+            raise InvalidRuleParamterError(_('invalid params {} of {} rule: {}').format(
+                ','.join(args), cls.name, e))
+
+    @classmethod
+    def clean_params(cls, params):
+        return params
+
     @classmethod
     def get_name(cls):
         return cls.name
 
 
+class StatelessRule:
+    name = 'stateless_rule'
+    message = _('{VALUE} of {FIELD} field is match rule {RULE_NAME}.')
+    description = _('describe the propuse of the current rule.')
+    parse_args = True
+    batch = False
+    database = False
+    cost = COST_PURE
+    index = 0
+
+    def __init__(self, field_name, args, message=None):
+        self.field_name = field_name
+        self.args = self.get_args(args)
+        self.message = message if message else self.message
+
+    def check(self, value, data=None):
+        if value:
+            return self.check_value(value, data)
+        else:
+            return self.check_null(value, data)
+
+    async def acheck(self, value, data=None):
+        return self.check(value, data)
+
+    def check_value(self, value, data=None):
+        raise NotImplementedError()
+
+    def check_null(self, value, data=None):
+        raise NotImplementedError()
+
+    def get_message(self, value, data=None):
+        return self.message.format(FIELD=self.field_name, VALUE=value, RULE_NAME=self.name)
+
+    def prepare(self, values):
+        return self
+
+    def get_lookup(self, value):
+        return None
+
+    def get_args(self, args):
+        if isinstance(args, tuple) or not self.parse_args:
+            return args
+        return tuple(map(lambda d: d.strip(), args.split(',')))
+
+    def get_arg(self, index):
+        if len(self.args) > index:
+            return self.args[index]
+        else:
+            return None
+
+    @classmethod
+    def get_name(cls):
+        return cls.name
+
+
+# runs a BaseRule subclass through the stateless protocol, the rule instance is built once from
+# the params and every thread checks the values with its own copy of it. the rules with their own
+# __init__ may read the value there, so they are still built for every value.
+class RuleAdapter(StatelessRule):
+    def __init__(self, rule_class, field_name, args, message=None, name=None):
+        self.rule_class = rule_class
+        self.name = name if name else rule_class.get_name()
+        self.field_name = field_name
+        self.args = args
+        self.message = message
+        self.per_value = rule_class.__init__ is not BaseRule.__init__
+        self.prototype = None if self.per_value else rule_class(field_name, None, args, message=message)
+        self.batch = rule_class.batch and not self.per_value
+        self.database = rule_class.database
+        self.cost = rule_class.cost
+        self.local = threading.local()
+
+    def __reduce__(self):
+        args = (self.rule_class, self.field_name, self.args, self.message, self.name)
+        return self.__class__, args, {'index': self.index}
+
+    def check(self, value, data=None):
+        if self.per_value:
+            rule = self.get_rule(value, data)
+            rule.check()
+            return True if rule.get_status() else RuleFailure(self, rule)
+
+        rule = getattr(self.local, 'rule', None)
+        if rule is None:
+            rule = self.local.rule = copy(self.prototype)
+
+        rule.field_value = value
+        rule.data = data
+        rule.status = True
+        try:
+            rule.check()
+            if rule.get_status():
+                return True
+
+            # the failed copy keeps the state its message is rendered from, the next values get a new copy
+            self.local.rule = None
+            return RuleFailure(self, rule)
+        finally:
+            if self.local.rule is rule:
+                rule.field_value = None
+                rule.data = None
+
+    async def acheck(self, value, data=None):
+        if self.cost < COST_IO:
+            return self.check(value, data)
+
+        # the awaiting rules may run concurrently in one thread, so each of them gets its own copy
+        rule = self.get_rule(value, data)
+        await rule.acheck()
+        return True if rule.get_status() else RuleFailure(self, rule)
+
+    def get_rule(self, value, data=None):
+        if self.per_value:
+            return self.rule_class(self.field_name, value, self.args, data=data, message=self.message)
+
+        rule = copy(self.prototype)
+        rule.field_value = value
+        rule.data = data
+        rule.status = True
+        return rule
+
+    def get_message(self, value, data=None):
+        return self.get_rule(value, data).get_message()
+
+    def prepare(self, values):
+        if self.per_value:
+            return self
+
+        rule = self.prototype.prepare(values)
+        if not rule:
+            return self
+
+        if isinstance(rule, BaseRule):
+            adapter = copy(self)
+            adapter.prototype = rule
+            adapter.local = threading.local()
+            return adapter
+        return rule
+
+    def get_lookup(self, value):
+        if self.per_value:
+            return None
+        return self.get_rule(value).get_lookup()
+
+
+# a failed check of an adapted rule, it is false and the message is rendered by the rule instance which was
+# checked, so a rule may keep what its message needs when it checks the value.
+class RuleFailure:
+    __slots__ = ('adapter', 'rule')
+
+    def __init__(self, adapter, rule):
+        self.adapter = adapter
+        self.rule = rule
+
+    def __bool__(self):
+        return False
+
+    @property
+    def name(self):
+        return self.adapter.name
+
+    @property
+    def index(self):
+        return self.adapter.index
+
+    def get_message(self, value, data=None):
+        return self.rule.get_message()
+
+
+def get_failure(rule, status):
+    # the failed checks of the adapted rules are recorded with the rule instances which were checked
+    return status if type(status) is RuleFailure else rule
+
+
 class Switch(BaseRule):
     name = 'switch'
     message = _('{VALUE} of {FIELD} is not in [{SWITCH}]')
@@ -108,10 +621,14 @@ class Switch(BaseRule):
     def _get_params(self):
         return self.args if self.args else []
 
+    def get_inline(self):
+        return 'not value or value in {SWITCH}', {'SWITCH': tuple(self._get_params())}
+
 
 class Alphabet(BaseRule):
     name = 'alphabet'
-    regex = r'[a-zA-Z]+'
+    cost = COST_REGEX
+    regex = re.compile(r'[a-zA-Z]+')
     message = _('{VALUE} of {FIELD} is not alphabet')
     description = _('The field under validation must be entirely alphabetic characters.')
 
@@ -119,7 +636,13 @@ class Alphabet(BaseRule):
         pass
 
     def check_value(self):
-        self.status = True if re.match(self.regex, self.field_value) else False
+        self.status = True if self.regex.match(self.field_value) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, False, False
 
 
 class Json(BaseRule):
@@ -139,49 +662,65 @@ class MinLength(BaseRule):
     name = 'min_length'
     message = _('{VALUE} of {FIELD} is shotter than {MIN}')
     description = _('check the field as a string and test the length if suites the given number')
+    param_schema = (Param('size', int, required=True),)
 
     def check_null(self):
         pass
 
     def check_value(self):
-        self.status = len(str(self.field_value)) >= int(self.args[0])
+        self.status = len(str(self.field_value)) >= self.params['size']
 
     def get_message(self):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, MIN=self.args[0])
 
+    def get_inline(self):
+        return 'not value or len(str(value)) >= {SIZE}', {'SIZE': self.params['size']}
+
 
 class MaxLength(BaseRule):
     name = 'max_length'
     message = _('{VALUE} of {FIELD} is longger than {MAX}')
     description = _('check the field as a string and test the length if suites the given number')
+    param_schema = (Param('size', int, required=True),)
 
     def check_null(self):
         pass
 
     def check_value(self):
-        self.status = len(str(self.field_value)) <= int(self.args[0])
+        self.status = len(str(self.field_value)) <= self.params['size']
 
     def get_message(self):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, MAX=self.args[0])
 
+    def get_inline(self):
+        return 'not value or len(str(value)) <= {SIZE}', {'SIZE': self.params['size']}
+
 
 class IDS(BaseRule):
     name = 'ids'
+    cost = COST_REGEX
     message = _('{VALUE} of {FIELD} is not a id series')
     description = _('check it the given value is id string such as 1,2,3,4')
-    regex = r'^\d+(?:,\d+)*$'
+    regex = re.compile(r'^\d+(?:,\d+)*$')
 
     def check_null(self):
         pass
 
     def check_value(self):
-        self.status = True if re.match(self.regex, self.field_value) else False
+        self.status = True if self.regex.match(self.field_value) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, False, False
 
 
 class Cellphone(BaseRule):
     # TODO fix different cellphone formats in different countries
     name = 'cellphone'
-    regex = r'^([\+]?[0-9]{2})?1[0-9]{10}$'
+    cost = COST_REGEX
+    regex = re.compile(r'^(?:[\+]?[0-9]{2})?1[0-9]{10}$')
     message = _('{VALUE} of {FIELD} is not a cellphone number')
     description = _('check if the given value is a cellphone number , '
                     'if there is a internation code it sould begin with + .')
@@ -190,11 +729,18 @@ class Cellphone(BaseRule):
         pass
 
     def check_value(self):
-        self.status = True if re.match(self.regex, self.field_value) else False
+        self.status = True if self.regex.match(self.field_value) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, False, False
 
 
 class Regex(BaseRule):
     name = 'regex'
+    cost = COST_REGEX
     message = _('{VALUE} of {FIELD} is not mathc the pattern {REGEX}')
     description = _('check the given value if suits the regex')
     parse_args = False
@@ -208,55 +754,106 @@ class Regex(BaseRule):
     def get_message(self):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, REGEX=self._get_regex())
 
+    @classmethod
+    def parse_params(cls, args):
+        # the pattern is resolved once by the bound rule, its copies which check the values share it
+        try:
+            return {'regex': args, 'pattern': patterns.get(args)} if isinstance(args, str) else None
+        except re.error:
+            return None
+
     def _get_regex(self):
         return self.args
 
+    def _get_pattern(self):
+        regex = self._get_regex()
+        if not isinstance(regex, str):
+            return regex
+        if self.params and self.params['regex'] is regex:
+            return self.params['pattern']
+        return patterns.get(regex)
+
     def _match(self):
-        return re.match(self._get_regex(), str(self.field_value))
+        return self._get_pattern().match(str(self.field_value))
+
+    def get_inline(self):
+        try:
+            regex = self._get_pattern()
+        except (TypeError, re.error):
+            return None
+        return 'not value or {REGEX}.match(str(value))', {'REGEX': regex}
+
+    def get_pattern(self):
+        try:
+            return self._get_pattern(), False, True
+        except (TypeError, re.error):
+            return None
 
 
 class Email(BaseRule):
     name = 'email'
+    cost = COST_REGEX
     message = _('{VALUE} of {FIELD} is not an email address')
     description = _('check for email addresses')
-    pattern = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
+    pattern = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
 
     def check_null(self):
         pass
 
     def check_value(self):
-        self.status = True if re.match(self.pattern, self.field_value) else False
+        self.status = True if self.pattern.match(self.field_value) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.pattern}
+
+    def get_pattern(self):
+        return self.pattern, False, False
 
 
 class Digits(BaseRule):
     # TODO add length control in digits rule
     name = 'digits'
+    cost = COST_REGEX
     message = _('{VALUE} of {FIELD} is not match digits')
     description = _('check if the given value is made of digits')
+    regex = re.compile(r'[0-9]+')
 
     def check_null(self):
         pass
 
     def check_value(self):
-        digits_regex = r'[0-9]+'
-        self.status = True if re.fullmatch(digits_regex, str(self.field_value)) else False
+        self.status = True if self.regex.fullmatch(str(self.field_value)) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.fullmatch(str(value))', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, True, True
 
 
 class Numberic(BaseRule):
     name = 'numberic'
+    cost = COST_REGEX
     message = _('{VALUE} of {FIELD} is not match numberic')
     description = _('check if the given value is a integer number')
+    regex = re.compile(r'^[1-9]{1}[0-9]*')
 
     def check_null(self):
         pass
 
     def check_value(self):
-        regex = r'^[1-9]{1}[0-9]*'
-        self.status = True if re.fullmatch(regex, str(self.field_value)) else False
+        self.status = True if self.regex.fullmatch(str(self.field_value)) else False
+
+    def get_inline(self):
+        return 'not value or {REGEX}.fullmatch(str(value))', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, True, True
 
 
 class ActiveURL(BaseRule):
     name = 'active_url'
+    cost = COST_IO
     message = '{VALUE} of {FIELD} field is not a active URL'
     description = _('check if the given value if an active url you can visit.')
 
@@ -269,9 +866,18 @@ class ActiveURL(BaseRule):
         except socket.gaierror:
             self.status = False
 
+    async def acheck_value(self):
+        # asyncio.get_running_loop is missed before python 3.7, get_event_loop gives the running loop there
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        try:
+            await loop.getaddrinfo(self.field_value, None)
+        except socket.gaierror:
+            self.status = False
+
 
 class Date(BaseRule):
     name = 'date'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} field is not a valid date format as {FORMAT_STR}')
     format_str = '%Y-%m-%d'
     description = _('check the given value if suits the date format of format_str')
@@ -285,7 +891,7 @@ class Date(BaseRule):
     def check_value(self):
         date_format = self.get_format()
         try:
-            datetime.datetime.strptime(self.field_value, date_format)
+            self.parse_value(parse_datetime, date_format)
         except ValueError:
             self.status = False
 
@@ -299,6 +905,7 @@ class Date(BaseRule):
 
 class Datetime(BaseRule):
     name = 'datetime'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} field is not a valid datetime format as {FORMAT_STR}')
     format_str = '%Y-%m-%d %H:%M:%S'
     description = _('check the given value if suits the date time format of format_str')
@@ -312,7 +919,7 @@ class Datetime(BaseRule):
     def check_value(self):
         datetime_format = self.get_format()
         try:
-            datetime.datetime.strptime(self.field_value, datetime_format)
+            self.parse_value(parse_datetime, datetime_format)
         except ValueError:
             self.status = False
 
@@ -324,8 +931,49 @@ class Datetime(BaseRule):
                                    RULE_NAME=self.name)
 
 
-class DateBefore(BaseRule):
+# the date param is parsed with the param format once, the field values are parsed with the field format
+class DateParamMixin:
+    param_schema = (Param('date', required=True), Param('param_format'), Param('field_format'))
+
+    @classmethod
+    def clean_params(cls, params):
+        params['param_format'] = params['param_format'] if params['param_format'] else cls.param_format_str
+        params['field_format'] = params['field_format'] if params['field_format'] else cls.field_format_str
+        params['date'] = parse_datetime(params['date'], params['param_format'])
+        return params
+
+    def _get_param_date(self):
+        return self.params['date']
+
+    def _get_field_date(self):
+        return self.parse_value(parse_datetime, self.params['field_format'])
+
+
+class DatetimeParamMixin:
+    param_schema = (Param('datetime', required=True),)
+
+    @classmethod
+    def clean_params(cls, params):
+        params['datetime'] = parse_datetime(params['datetime'], cls.param_format_str)
+        return params
+
+    def _get_param_datetime(self):
+        return self.params['datetime']
+
+
+class RangeParamMixin:
+    param_schema = (Param('begin', required=True), Param('end', required=True))
+
+    @classmethod
+    def clean_params(cls, params):
+        params['begin'] = parse_datetime(params['begin'], cls.param_format_str)
+        params['end'] = parse_datetime(params['end'], cls.param_format_str)
+        return params
+
+
+class DateBefore(DateParamMixin, BaseRule):
     name = 'date_before'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not before date {DATE}')
     field_format_str = '%Y-%m-%d'
     param_format_str = '%Y-%m-%d'
@@ -339,29 +987,15 @@ class DateBefore(BaseRule):
         field_date = self._get_field_date()
         self.status = field_date < param_date
 
-    def _get_param_date(self):
-        date_str = self.get_arg(0)
-
-        if not date_str:
-            raise RuleMissedParameterError(_('DateBefore Rule missed a paramter'))
-
-        param_format_str = self.get_arg(1) if self.get_arg(1) else self.param_format_str
-        date = datetime.datetime.strptime(date_str, param_format_str)
-        return date
-
-    def _get_field_date(self):
-        field_format_str = self.get_arg(2) if self.get_arg(2) else self.field_format_str
-        date = datetime.datetime.strptime(self.field_value, field_format_str)
-        return date
-
     def get_message(self):
         return self.message.format(VALUE=self.field_value,
                                    FIELD=self.field_name,
                                    DATE=self.args[0])
 
 
-class DateAfter(BaseRule):
+class DateAfter(DateParamMixin, BaseRule):
     name = 'date_after'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not after date {DATE}')
     field_format_str = '%Y-%m-%d'
     param_format_str = '%Y-%m-%d'
@@ -375,29 +1009,15 @@ class DateAfter(BaseRule):
         field_date = self._get_field_date()
         self.status = field_date > param_date
 
-    def _get_param_date(self):
-        date_str = self.args[0]
-
-        if not date_str:
-            raise RuleMissedParameterError('date_after missed a parameter')
-
-        param_format_str = self.get_arg(1) if self.get_arg(1) else self.param_format_str
-        date = datetime.datetime.strptime(date_str, param_format_str)
-        return date
-
-    def _get_field_date(self):
-        field_format_str = self.get_arg(2) if self.get_arg(2) else self.field_format_str
-        date = datetime.datetime.strptime(self.field_value, field_format_str)
-        return date
-
     def get_message(self):
         return self.message.format(VALUE=self.field_value,
                                    FIELD=self.field_name,
                                    DATE=self.args[0])
 
 
-class DateRange(BaseRule):
+class DateRange(RangeParamMixin, BaseRule):
     name = 'date_range'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not in range date of {BEGIN} to {END}')
     field_format_str = '%Y-%m-%d'
     param_format_str = '%Y-%m-%d'
@@ -412,16 +1032,10 @@ class DateRange(BaseRule):
         self.status = begin < date < end
 
     def _get_param_date(self):
-        begin_date_str = self.args[0]
-        begin_date = datetime.datetime.strptime(begin_date_str, self.param_format_str)
-
-        end_date_str = self.args[1]
-        end_date = datetime.datetime.strptime(end_date_str, self.param_format_str)
-
-        return begin_date, end_date
+        return self.params['begin'], self.params['end']
 
     def _get_field_date(self):
-        date = datetime.datetime.strptime(self.field_value, self.field_format_str)
+        date = self.parse_value(parse_datetime, self.field_format_str)
         return date
 
     def get_message(self):
@@ -431,8 +1045,9 @@ class DateRange(BaseRule):
                                    END=self.args[1])
 
 
-class DatetimeBefore(BaseRule):
+class DatetimeBefore(DatetimeParamMixin, BaseRule):
     name = 'datetime_before'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not before {DATETIME}')
     field_format_str = '%Y-%m-%d %H:%M:%S'
     param_format_str = '%Y-%m-%d %H:%M:%S'
@@ -450,15 +1065,12 @@ class DatetimeBefore(BaseRule):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, DATETIME=self.args[0])
 
     def _get_field_datetime(self):
-        return datetime.datetime.strptime(self.field_value, self.field_format_str)
-
-    def _get_param_datetime(self):
-        datetime_str = self.args[0] if len(self.args) == 1 else None
-        return datetime.datetime.strptime(datetime_str, self.param_format_str)
+        return self.parse_value(parse_datetime, self.field_format_str)
 
 
-class DatetimeRange(BaseRule):
+class DatetimeRange(RangeParamMixin, BaseRule):
     name = 'datetime_range'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not in range of {BEGIN} to {END}')
     field_format_str = '%Y-%m-%d %H:%M:%S'
     param_format_str = '%Y-%m-%d %H:%M:%S'
@@ -476,20 +1088,15 @@ class DatetimeRange(BaseRule):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, BEGIN=self.args[0], END=self.args[1])
 
     def _get_field_datetime(self):
-        return datetime.datetime.strptime(self.field_value, self.field_format_str)
+        return self.parse_value(parse_datetime, self.field_format_str)
 
     def _get_param_datetime(self):
-        begin_datetime_str = self.args[0] if len(self.args) == 2 else None
-        begin = datetime.datetime.strptime(begin_datetime_str, self.param_format_str)
-
-        end_datetime_str = self.args[1] if len(self.args) == 2 else None
-        end = datetime.datetime.strptime(end_datetime_str, self.param_format_str)
-
-        return begin, end
+        return self.params['begin'], self.params['end']
 
 
-class DatetimeAfter(BaseRule):
+class DatetimeAfter(DatetimeParamMixin, BaseRule):
     name = 'datetime_after'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not in after {DATETIME}')
     field_format_str = '%Y-%m-%d %H:%M:%S'
     param_format_str = '%Y-%m-%d %H:%M:%S'
@@ -507,11 +1114,7 @@ class DatetimeAfter(BaseRule):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, DATETIME=self.args[0])
 
     def _get_field_datetime(self):
-        return datetime.datetime.strptime(self.field_value, self.field_format_str)
-
-    def _get_param_datetime(self):
-        datetime_str = self.args[0] if len(self.args) == 1 else None
-        return datetime.datetime.strptime(datetime_str, self.param_format_str)
+        return self.parse_value(parse_datetime, self.field_format_str)
 
 
 class Unblank(BaseRule):
@@ -530,6 +1133,9 @@ class Unblank(BaseRule):
 
         self.status = True if value_str else False
 
+    def get_inline(self):
+        return 'not value or str(value).strip()', {}
+
 
 class Required(BaseRule):
     name = 'required'
@@ -547,6 +1153,9 @@ class Required(BaseRule):
 
         self.status = True if value_str else False
 
+    def get_inline(self):
+        return 'value and str(value).strip()', {}
+
 
 class Accepted(BaseRule):
     name = 'accepted'
@@ -573,23 +1182,164 @@ class Accepted(BaseRule):
                                    FLAGS=self.get_flag_str(),
                                    RULE_NAME=self.name)
 
+    def get_inline(self):
+        return 'not value or value.lower() in {FLAGS}', {'FLAGS': tuple(self.flag) + tuple(self.args)}
+
 
 class Unique(BaseRule):
     name = 'unique'
+    cost = COST_IO
+    batch = True
+    database = True
+    chunk_size = 500
+    batch_lookups = None
+    # the values absent from the bloom filter pass without a query. a stale filter would fail the existing
+    # values of the exist rule, so only the unique rule uses the filters.
+    bloom = True
+    param_schema = (Param('model', required=True), Param('model_field', required=True), Param('cache', int))
     message = _('{VALUE} of {MODEL} with {MODEL_FIELD} is not unique')
     description = _('the given value must unique of the table')
 
+    @classmethod
+    def clean_params(cls, params):
+        if params['cache'] is not None and params['cache'] <= 0:
+            raise ValueError('the cache timeout must be positive')
+        return params
+
     def check_null(self):
         pass
 
     def check_value(self):
         self.status = self.check_model()
 
+    async def acheck_value(self):
+        self.status = await self.acheck_model()
+
     def check_model(self):
-        model_name, model_field = self.args
-        model = self.get_model(model_name)
-        qs = model.objects.filter(**{model_field: self.field_value})
-        return not qs.exists()
+        exists = self.get_lookup_result()
+        if exists is not None:
+            return not exists
+
+        return not self.query_exists()
+
+    async def acheck_model(self):
+        exists = self.get_lookup_result()
+        if exists is not None:
+            return not exists
+
+        return not await self.aquery_exists()
+
+    def query_exists(self):
+        # the values the bloom filter of the model field has never seen are not queried, and the rules with a
+        # cache timeout keep the result of the query in the lookup cache.
+        if self.is_absent():
+            return False
+
+        if self.params['cache'] is None:
+            return self.get_queryset().exists()
+
+        model = self.get_model(self.params['model'])
+        return lookup_cache.get(model, self.get_cache_key(), lambda: self.get_queryset().exists(),
+                                self.params['cache'])
+
+    async def aquery_exists(self):
+        if self.is_absent():
+            return False
+
+        if self.params['cache'] is None:
+            return await self.aexists(self.get_queryset())
+
+        from asgiref.sync import sync_to_async
+        return await sync_to_async(self.query_exists)()
+
+    def get_cache_key(self):
+        return self.params['model_field'], self.field_value
+
+    def is_absent(self):
+        if not self.bloom or not bloom_filters.filters:
+            return False
+        return bloom_filters.is_absent(self.get_model(self.params['model']), self.params['model_field'],
+                                       self.field_value)
+
+    def get_queryset(self):
+        model = self.get_model(self.params['model'])
+        return model.objects.filter(**{self.params['model_field']: self.field_value})
+
+    def get_lookup(self):
+        # the cached rules, the values absent from the bloom filter and the rules with their own queryset,
+        # which the grouped query would not use, are not queried with the others
+        if type(self).get_queryset is not Unique.get_queryset:
+            return None
+        if self.params['cache'] is not None or self.is_absent():
+            return None
+        return self.get_model(self.params['model']), self.params['model_field'], self.field_value
+
+    def get_lookup_result(self):
+        # the result of the lookup resolved with the values of the batch or with the other lookups of the
+        # validation, or None
+        try:
+            if self.batch_lookups is not None and self.field_value in self.batch_lookups:
+                return self.batch_lookups[self.field_value]
+
+            lookups = getattr(self.data, 'lookups', None)
+            return lookups.get(self.get_lookup(), None) if lookups else None
+        except TypeError:
+            return None
+
+    def prepare(self, values):
+        # the values of a batch are looked up by chunks of field__in queries and the rules of the records
+        # are answered from the found values, the values which can not be converted by the model field are
+        # still looked up one by one. the found values are compared in python, so the fields which the
+        # database compares another way are not prepared.
+        if type(self).get_queryset is not Unique.get_queryset:
+            return None
+
+        model_field = self.params['model_field']
+        model = self.get_model(self.params['model'])
+        field = self.get_field(model, model_field)
+        if field is None or not compares_exactly(model, field):
+            return None
+
+        from django.core.exceptions import ValidationError
+        keys = {}
+        for value in values:
+            if not value:
+                continue
+            try:
+                key = field.to_python(value)
+                hash(key)
+                keys[value] = key
+            except (ValidationError, ValueError, TypeError):
+                continue
+
+        found = set()
+        queried = list(set(key for key in keys.values()
+                           if not self.bloom or not bloom_filters.is_absent(model, model_field, key)))
+        for begin in range(0, len(queried), self.chunk_size):
+            qs = model.objects.filter(**{model_field + '__in': queried[begin:begin + self.chunk_size]})
+            found.update(qs.values_list(model_field, flat=True))
+
+        rule = copy(self)
+        rule.batch_lookups = dict((value, key in found) for value, key in keys.items())
+        return rule
+
+    @staticmethod
+    def get_field(model, name):
+        from django.core.exceptions import FieldDoesNotExist
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        return field if field.concrete and not field.many_to_many else None
+
+    @staticmethod
+    async def aexists(qs):
+        if hasattr(qs, 'aexists'):
+            return await qs.aexists()
+
+        # django older than 4.1 has no async queryset api
+        from asgiref.sync import sync_to_async
+        return await sync_to_async(qs.exists)()
 
     @staticmethod
     def get_model(name):
@@ -610,29 +1360,43 @@ class Unique(BaseRule):
 
 class AlphaDash(BaseRule):
     name = 'alpha_dash'
+    cost = COST_REGEX
     message = _('{VALUE} is invalid alpha dash format string.')
-    regex = '[a-zA-Z-_]+'
+    regex = re.compile('[a-zA-Z-_]+')
     description = _('The field under validation may have alpha-numeric characters, as well as dashes and underscores.')
 
     def check_value(self):
-        self.status = re.match(self.regex, self.field_value)
+        self.status = self.regex.match(self.field_value)
 
     def check_null(self):
         pass
 
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, False, False
+
 
 class AlphaNumber(BaseRule):
     name = 'alpha_number'
+    cost = COST_REGEX
     message = _('{VALUE} is not a alpha-number string.')
-    regex = '[a-zA-Z0-9]+'
+    regex = re.compile('[a-zA-Z0-9]+')
     description = _('the given value must conbines with only alphabets and numbers ')
 
     def check_value(self):
-        self.status = re.match(self.regex, self.field_value)
+        self.status = self.regex.match(self.field_value)
 
     def check_null(self):
         pass
 
+    def get_inline(self):
+        return 'not value or {REGEX}.match(value)', {'REGEX': self.regex}
+
+    def get_pattern(self):
+        return self.regex, False, False
+
 
 class Array(BaseRule):
     name = 'array'
@@ -646,8 +1410,9 @@ class Array(BaseRule):
         pass
 
 
-class DateBeforeEqual(BaseRule):
+class DateBeforeEqual(DateParamMixin, BaseRule):
     name = 'date_before_equal'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not before or equal date {DATE}')
     field_format_str = '%Y-%m-%d'
     param_format_str = '%Y-%m-%d'
@@ -661,29 +1426,15 @@ class DateBeforeEqual(BaseRule):
         field_date = self._get_field_date()
         self.status = field_date <= param_date
 
-    def _get_param_date(self):
-        date_str = self.get_arg(0)
-
-        if not date_str:
-            raise RuleMissedParameterError(_('DateBefore Rule missed a paramter'))
-
-        param_format_str = self.get_arg(1) if self.get_arg(1) else self.param_format_str
-        date = datetime.datetime.strptime(date_str, param_format_str)
-        return date
-
-    def _get_field_date(self):
-        field_format_str = self.get_arg(2) if self.get_arg(2) else self.field_format_str
-        date = datetime.datetime.strptime(self.field_value, field_format_str)
-        return date
-
     def get_message(self):
         return self.message.format(VALUE=self.field_value,
                                    FIELD=self.field_name,
                                    DATE=self.args[0])
 
 
-class DateAfterEqual(BaseRule):
+class DateAfterEqual(DateParamMixin, BaseRule):
     name = 'date_after_equal'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not after or equal date {DATE}')
     field_format_str = '%Y-%m-%d'
     param_format_str = '%Y-%m-%d'
@@ -697,29 +1448,15 @@ class DateAfterEqual(BaseRule):
         field_date = self._get_field_date()
         self.status = field_date >= param_date
 
-    def _get_param_date(self):
-        date_str = self.args[0]
-
-        if not date_str:
-            raise RuleMissedParameterError('date_after missed a parameter')
-
-        param_format_str = self.get_arg(1) if self.get_arg(1) else self.param_format_str
-        date = datetime.datetime.strptime(date_str, param_format_str)
-        return date
-
-    def _get_field_date(self):
-        field_format_str = self.get_arg(2) if self.get_arg(2) else self.field_format_str
-        date = datetime.datetime.strptime(self.field_value, field_format_str)
-        return date
-
     def get_message(self):
         return self.message.format(VALUE=self.field_value,
                                    FIELD=self.field_name,
                                    DATE=self.args[0])
 
 
-class DateTimeBeforeEqual(BaseRule):
+class DateTimeBeforeEqual(DatetimeParamMixin, BaseRule):
     name = 'datetime_before_equal'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not before or equal {DATETIME}')
     field_format_str = '%Y-%m-%d %H:%M:%S'
     param_format_str = '%Y-%m-%d %H:%M:%S'
@@ -737,15 +1474,12 @@ class DateTimeBeforeEqual(BaseRule):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, DATETIME=self.args[0])
 
     def _get_field_datetime(self):
-        return datetime.datetime.strptime(self.field_value, self.field_format_str)
-
-    def _get_param_datetime(self):
-        datetime_str = self.args[0] if len(self.args) == 1 else None
-        return datetime.datetime.strptime(datetime_str, self.param_format_str)
+        return self.parse_value(parse_datetime, self.field_format_str)
 
 
-class DatetimeAfterEqual(BaseRule):
+class DatetimeAfterEqual(DatetimeParamMixin, BaseRule):
     name = 'datetime_after_equal'
+    cost = COST_PARSE
     message = _('{VALUE} of {FIELD} is not after or equal {DATETIME}')
     field_format_str = '%Y-%m-%d %H:%M:%S'
     param_format_str = '%Y-%m-%d %H:%M:%S'
@@ -763,17 +1497,14 @@ class DatetimeAfterEqual(BaseRule):
         return self.message.format(VALUE=self.field_value, FIELD=self.field_name, DATETIME=self.args[0])
 
     def _get_field_datetime(self):
-        return datetime.datetime.strptime(self.field_value, self.field_format_str)
-
-    def _get_param_datetime(self):
-        datetime_str = self.args[0] if len(self.args) == 1 else None
-        return datetime.datetime.strptime(datetime_str, self.param_format_str)
+        return self.parse_value(parse_datetime, self.field_format_str)
 
 
 class Between(BaseRule):
     name = 'between'
     message = _('{VALUE} is not between of the {START} -> {END}')
     description = _('check the given value if between the params, it\'s only adapted for integer and string value')
+    param_schema = (Param('start', int, required=True), Param('stop', int, required=True))
 
     def check_value(self):
         start, stop = self._get_params()
@@ -782,7 +1513,7 @@ class Between(BaseRule):
 
     def get_value_length(self):
         try:
-            length = int(self.field_value)
+            length = self.parse_value(int)
         except ValueError:
             length = len(self.field_value)
 
@@ -797,13 +1528,7 @@ class Between(BaseRule):
         return self.message.format(VALUE=self.field_value, START=start, STOP=stop)
 
     def _get_params(self):
-        if len(self.args) < 2:
-            raise InvalidRuleParamterError(_('between rule needs 2 params.'))
-
-        else:
-            start = int(self.args[0])
-            stop = int(self.args[1])
-            return start, stop
+        return self.params['start'], self.params['stop']
 
 
 class Boolean(BaseRule):
@@ -818,6 +1543,9 @@ class Boolean(BaseRule):
     def check_null(self):
         pass
 
+    def get_inline(self):
+        return 'not value or value.strip().lower() in {TYPES}', {'TYPES': tuple(self.type_)}
+
 
 class FileRuleMixin:
     def check_value(self):
@@ -880,16 +1608,11 @@ class Attachement(File):
 
 class SizeMixin:
     types = ['string', 'number', 'array', 'file']
+    param_schema = (Param('type', one_of(*types), required=True), Param('size', float, required=True))
 
     def check_value(self):
-        _type = self.get_arg(0)
-        _size = self.get_arg(1)
-
-        if _type and _size and _type in self.types:
-            size = self._get_field_size(_type)
-            self._check_size(float(_size), float(size))
-        else:
-            raise InvalidRuleParamterError(_('invalid rule paramters'))
+        size = self._get_field_size(self.params['type'])
+        self._check_size(self.params['size'], float(size))
 
     def check_null(self):
         pass
@@ -917,7 +1640,7 @@ class SizeMixin:
         return len(_value)
 
     def _get_number_size(self):
-        _value = float(self.field_value)
+        _value = self.parse_value(float)
         return _value
 
     def _get_file_size(self):
@@ -967,18 +1690,22 @@ class Size(SizeMixin, BaseRule):
 
 class Username(BaseRule):
     name = 'username'
+    cost = COST_REGEX
     message = _('the input {VALUE} is not a proper username.')
     description = _('this rule will check the normal username, the initial of username must be a alphabet character and'
                     'it could conbimes with digits, dot, underscore and dash.')
 
-    regex = r'^[a-z]{1}[a-z0-9\.\-_]*$'
+    regex = re.compile(r'^[a-z]{1}[a-z0-9\.\-_]*$')
 
     def check_value(self):
-        self.status = True if re.fullmatch(self.regex, self.field_value) else False
+        self.status = True if self.regex.fullmatch(self.field_value) else False
 
     def check_null(self):
         pass
 
+    def get_pattern(self):
+        return self.regex, True, False
+
 
 class Password(BaseRule):
     name = 'password'
@@ -998,6 +1725,7 @@ class Password(BaseRule):
     special = (33, 47), (58, 64), (123, 126)
 
     level = ['low', 'middle', 'high']
+    param_schema = (Param('level', one_of(*level), required=True),)
 
     def check_value(self):
         level = self.get_level()
@@ -1012,11 +1740,7 @@ class Password(BaseRule):
         pass
 
     def get_level(self):
-        level = self.args[0]
-        if level not in self.level:
-            raise InvalidRuleParamterError('parameters must be one of : low, middle, high')
-        else:
-            return level
+        return self.params['level']
 
     def check_low(self):
         return len(self.field_value) >= 7
@@ -1165,12 +1889,13 @@ class Same(BaseRule):
 
 class Decimal(BaseRule):
     name = 'decimal'
+    cost = COST_REGEX
     message = _('the input value {VALUE} of {FIELD} is not a decimal format number')
     description = _('')
+    regex = re.compile(r'^[\+\-]?[0-9]+(?:\.[0-9]+)?$')
 
     def check_decimal(self):
-        r = r'^([\+\-])?[0-9]+(\.[0-9]+)?$'
-        m = re.fullmatch(r, str(self.field_value))
+        m = self.regex.fullmatch(str(self.field_value))
         return True if m else False
 
     def check_null(self):
@@ -1183,34 +1908,97 @@ class Decimal(BaseRule):
         return self.message.format(FIELD=self.field_name,
                                    VALUE=self.field_value)
 
+    def get_pattern(self):
+        return self.regex, True, True
+
 
 class Exist(Unique):
     name = 'exist'
+    bloom = False
     message = _('{VALUE} of {MODEL} with {MODEL_FIELD}  not existis in database')
     description = _('the given value must exist in the table of the database')
 
     def check_model(self):
-        model_name, model_field = self.args
-        model = self.get_model(model_name)
+        exists = self.get_lookup_result()
+        if exists is not None:
+            return exists
+
         try:
-            qs = model.objects.filter(**{model_field: self.field_value})
+            return self.query_exists()
+        except ValueError:
+            return False
+
+    async def acheck_model(self):
+        exists = self.get_lookup_result()
+        if exists is not None:
+            return exists
+
+        try:
+            return await self.aquery_exists()
         except ValueError:
             return False
-        else:
-            return qs.exists()
+
+
+def compares_exactly(model, field):
+    # tells whether the database compares the values of the field like python compares the converted values.
+    # the text of the databases with case insensitive or padded collations, the decimals rounded to the places
+    # of their columns and the floats are not compared the same way.
+    from django.db import connections, router, models
+
+    if isinstance(field, (models.IntegerField, models.AutoField, models.UUIDField)):
+        return True
+    if not isinstance(field, (models.CharField, models.TextField)):
+        return False
+
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor not in ('sqlite', 'postgresql') or getattr(field, 'db_collation', None):
+        return False
+    return not (field.db_type(connection) or '').lower().startswith('citext')
+
+
+def resolve_lookups(model, lookups):
+    # tells which of the (field, value) lookups match some records of the model by one query, every lookup is
+    # an exists subquery which stops at the first record it finds. the lookups are left to their rules when
+    # some value can not be used in the query.
+    from django.db.models import Exists
+
+    lookups = list(lookups)
+    try:
+        subqueries = dict(('lookup_{}'.format(index), Exists(model.objects.filter(**{field: value})))
+                          for index, (field, value) in enumerate(lookups))
+        found = next(iter(model.objects.annotate(**subqueries).order_by().values(*subqueries)[:1]), None)
+    except ValueError:
+        return {}
+
+    # an empty table gives no row, so none of the lookups matches
+    return dict(((model, field, value), bool(found and found['lookup_{}'.format(index)]))
+                for index, (field, value) in enumerate(lookups))
+
+
+async def aresolve_lookups(model, lookups):
+    from asgiref.sync import sync_to_async
+    return await sync_to_async(resolve_lookups)(model, lookups)
 
 
 class UniqueAgainst(Unique):
     name = 'unique_against'
+    bloom = False
     message = _('the given {MODEL_NAME} record is exist against '
                 'the {MODEL_FIELD} column by {MODEL_VALUE} with value {VALUE}')
     description = _('check the given record weather exists in the database against the given column value')
+    param_schema = (Param('model', required=True), Param('model_field', required=True),
+                    Param('model_value', required=True), Param('cache', int))
 
-    def check_model(self):
-        model_name, model_field, model_value = self.args
-        model = self.get_model(model_name)
-        qs = model.objects.filter(**{model_field: self.field_value}).exclude(**{model_field: model_value})
-        return not qs.exists()
+    def get_cache_key(self):
+        return self.params['model_field'], self.params['model_value'], self.field_value
+
+    def get_queryset(self):
+        model_field, model_value = self.params['model_field'], self.params['model_value']
+        model = self.get_model(self.params['model'])
+        return model.objects.filter(**{model_field: self.field_value}).exclude(**{model_field: model_value})
+
+    def get_lookup(self):
+        return None
 
     def get_message(self):
         return self.message.format(MODEL_NAME=self.args[0],
@@ -1225,30 +2013,30 @@ class Integer(Regex):
     message = 'the given value {VALUE} for {FIELD} field is not a proper decimal integer'
     description = _('check the given value if fits the decimal integer')
     parse_args = False
+    regex = re.compile(r'^[+-]*[1-9]+[0-9]*$')
 
     def _get_regex(self):
-        pattern = r'^[+-]*[1-9]+[0-9]*$'
-        return pattern
+        return self.regex
 
 
 class PositiveInteger(Regex):
     name = 'pos_integer'
     message = 'the given value {VALUE} for {FIELD} field is not a proper positive decimal integer'
     description = 'check the given value if fits the positive decimal integer'
+    regex = re.compile(r'^[+]*[1-9]+[0-9]*$')
 
     def _get_regex(self):
-        pattern = r'^[+]*[1-9]+[0-9]*$'
-        return pattern
+        return self.regex
 
 
 class NegativeInteger(Regex):
     name = 'neg_integer'
     message = 'the given value {VALUE} for {FIELD} field is not a proper negative decimal integer'
     description = 'check the given value if fits the negative decimal integer'
+    regex = re.compile(r'^[-]+[1-9]+[0-9]*$')
 
     def _get_regex(self):
-        pattern = r'^[-]+[1-9]+[0-9]*$'
-        return pattern
+        return self.regex
 
 
 class Percentage(BaseRule):
@@ -1261,7 +2049,7 @@ class Percentage(BaseRule):
 
     def check_value(self):
         try:
-            value = int(self.field_value)
+            value = self.parse_value(int)
         except ValueError:
             self.status = False
         else:
@@ -1270,6 +2058,7 @@ class Percentage(BaseRule):
 
 class IPAddress(BaseRule):
     name = 'ip_address'
+    cost = COST_PARSE
     message = 'the given value {VALUE} for {FIELD} field is not a ipv4 or v6 address'
     description = _('check the given value if it is a proper ipv4 or v6 address')
 
@@ -1286,11 +2075,487 @@ class IPAddress(BaseRule):
             self.status = True
 
 
+class RulePlan:
+    __slots__ = ('name', 'params', 'message', 'index')
+
+    def __init__(self, name, params, message=None, index=0):
+        self.name = name
+        self.params = params
+        self.message = message
+        self.index = index
+
+    def get_args(self, rule_class):
+        if not rule_class.parse_args:
+            return self.params
+        return tuple(map(lambda d: d.strip(), self.params.split(',')))
+
+
+class FieldPlan:
+    __slots__ = ('name', 'rules', 'bail')
+
+    def __init__(self, name, rules, bail=False):
+        self.name = name
+        self.rules = rules
+        self.bail = bail
+
+
+# a read only view of the data under validation, the data is only copied when it is written.
+class DataView(MutableMapping):
+    def __init__(self, data):
+        self.origin = data if data is not None else {}
+        self.copied = None
+        self.parsed = {}
+        self.lookups = {}
+
+    def get_data(self):
+        return self.origin if self.copied is None else self.copied
+
+    def get_writable_data(self):
+        if self.copied is None:
+            self.copied = copy(self.origin)
+        return self.copied
+
+    def get(self, key, default=None):
+        return self.get_data().get(key, default)
+
+    def __getitem__(self, key):
+        return self.get_data()[key]
+
+    def __setitem__(self, key, value):
+        self.get_writable_data()[key] = value
+
+    def __delitem__(self, key):
+        del self.get_writable_data()[key]
+
+    def __contains__(self, key):
+        return key in self.get_data()
+
+    def __iter__(self):
+        return iter(self.get_data())
+
+    def __len__(self):
+        return len(self.get_data())
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('origin', 'copied', 'parsed', 'lookups'):
+            raise AttributeError(name)
+        return getattr(self.get_data(), name)
+
+    def __repr__(self):
+        return '<DataView {}>'.format(repr(self.get_data()))
+
+
+# the patterns of several rules of a field fused into one pattern, every pattern is tried in a lookahead and
+# an empty group after it tells if it matched, so the value is scanned once for all the rules.
+class FusedPattern:
+    # the patterns with inline flags are not fused, their flags would change the fused one. the patterns with
+    # groups are not fused either, the numbers of their groups would change and break their references.
+    unsafe = re.compile(r'\(\?[aiLmsux]')
+
+    def __init__(self, patterns):
+        parts = []
+        for i, (pattern, full) in enumerate(patterns):
+            parts.append('(?:(?=(?:{}){})(?P<_fused{}>)|)'.format(pattern.pattern, r'\Z' if full else '', i))
+
+        self.pattern = re.compile(''.join(parts), patterns[0][0].flags)
+        self.groups = tuple(self.pattern.groupindex['_fused{}'.format(i)] for i in range(len(patterns)))
+        self.last = (None, None)
+
+    def get(self, value):
+        # the rules of a field check the same value one after another, so the result of the last one is kept
+        last = self.last
+        if last[0] is value:
+            return last[1]
+
+        match = self.pattern.match(value)
+        result = tuple(match.group(group) is not None for group in self.groups)
+        self.last = (value, result)
+        return result
+
+    @classmethod
+    def can_fuse(cls, pattern):
+        if not isinstance(pattern, PatternCache.type):
+            return False
+        return not pattern.groups and not cls.unsafe.search(pattern.pattern)
+
+
+# checks a rule with its part of a fused pattern, the messages are still given by the rule
+class FusedRule(StatelessRule):
+    def __init__(self, rule, fused, index, to_str):
+        self.rule = rule
+        self.name = rule.name
+        self.field_name = rule.field_name
+        self.cost = rule.cost
+        self.index = rule.index
+        self.fused = fused
+        self.position = index
+        self.to_str = to_str
+
+    def check(self, value, data=None):
+        if not value:
+            return True
+        return self.fused.get(str(value) if self.to_str else value)[self.position]
+
+    def get_message(self, value, data=None):
+        return self.rule.get_message(value, data)
+
+    def get_inline(self):
+        expression = 'not value or {GET}(str(value))[{POSITION}]' if self.to_str else \
+            'not value or {GET}(value)[{POSITION}]'
+        return expression, {'GET': self.fused.get, 'POSITION': self.position}
+
+
+# the compiled validation of a Validator class, rule strings are parsed once per class and
+# rule classes are resolved once per rules mapping.
+class ValidationPlan:
+    max_bound = 32
+    bail = 'bail'
+    fuse = True
+
+    def __init__(self, validation, message=None):
+        message = message if message else {}
+        self.fields = tuple(self._get_field(name, rules, message.get(name, {}))
+                            for name, rules in validation.items())
+        self.bound = {}
+        self.compiled = {}
+        self.lookup_rules = {}
+
+    def __getstate__(self):
+        # the bound rules and the compiled functions are built again after unpickling
+        return {'fields': self.fields}
+
+    def __setstate__(self, state):
+        self.fields = state['fields']
+        self.bound = {}
+        self.compiled = {}
+        self.lookup_rules = {}
+
+    def bind(self, rules=None):
+        key = tuple(rules.items()) if rules else None
+        bound = self.bound.get(key, None)
+
+        if bound is None:
+            bound = tuple((field.name, self._bind_rules(field, rules if rules else default_rules), field.bail)
+                          for field in self.fields)
+
+            if len(self.bound) >= self.max_bound:
+                self.bound.clear()
+            self.bound[key] = bound
+
+        return bound
+
+    def get_lookup_rules(self, rules=None):
+        key = tuple(rules.items()) if rules else None
+        lookup_rules = self.lookup_rules.get(key, None)
+
+        if lookup_rules is None:
+            lookup_rules = tuple((name, rule) for name, field_rules, _ in self.bind(rules) for rule in field_rules
+                                 if self._has_lookup(rule))
+
+            if len(self.lookup_rules) >= self.max_bound:
+                self.lookup_rules.clear()
+            self.lookup_rules[key] = lookup_rules
+
+        return lookup_rules
+
+    @staticmethod
+    def _has_lookup(rule):
+        if type(rule) is RuleAdapter:
+            return rule.rule_class.get_lookup is not BaseRule.get_lookup
+        return type(rule).get_lookup is not StatelessRule.get_lookup
+
+    def compile(self, rules=None):
+        key = tuple(rules.items()) if rules else None
+        function = self.compiled.get(key, None)
+
+        if function is None:
+            function = self._compile(self.bind(rules))
+
+            if len(self.compiled) >= self.max_bound:
+                self.compiled.clear()
+            self.compiled[key] = function
+
+        return function
+
+    @staticmethod
+    def prepare(fields, records):
+        prepared = []
+        for name, rules, bail in fields:
+            if any(rule.batch for rule in rules):
+                values = [record.get(name, None) for record in records]
+                rules = tuple(rule.prepare(values) if rule.batch else rule for rule in rules)
+            prepared.append((name, rules, bail))
+        return tuple(prepared)
+
+    def _bind_rules(self, field, rules):
+        bound = [self._bind_rule(field, rule, rules) for rule in field.rules]
+        bound = self._fuse_rules(bound) if self.fuse else bound
+        return tuple(sorted(bound, key=lambda rule: rule.cost))
+
+    def _fuse_rules(self, rules):
+        # the pattern rules of a field which convert the values the same way and have the same flags are fused
+        groups = {}
+        for position, rule in enumerate(rules):
+            pattern = self._call_rule(rule, 'get_pattern')
+            if pattern and FusedPattern.can_fuse(pattern[0]):
+                groups.setdefault((pattern[2], pattern[0].flags), []).append((position, pattern[0], pattern[1]))
+
+        rules = list(rules)
+        for (to_str, _), fused in groups.items():
+            if len(fused) < 2:
+                continue
+
+            try:
+                pattern = FusedPattern([(pattern, full) for _, pattern, full in fused])
+            except re.error:
+                continue
+
+            for index, (position, _, _) in enumerate(fused):
+                rules[position] = FusedRule(rules[position], pattern, index, to_str)
+
+        return rules
+
+    @staticmethod
+    def _bind_rule(field, rule, rules):
+        rule_class = rules.get(rule.name, None)
+        if not rule_class:
+            raise RuleNotFoundError(rule.name)
+
+        # the params of the default rules are checked when the class is created, the rules which the extra rules
+        # replace are checked with their params when they are bound.
+        args = rule.get_args(rule_class)
+        try:
+            if issubclass(rule_class, StatelessRule):
+                instance = rule_class(field.name, args, message=rule.message)
+            else:
+                instance = RuleAdapter(rule_class, field.name, args, message=rule.message, name=rule.name)
+        except (InvalidRuleParamterError, RuleMissedParameterError) as e:
+            raise type(e)('{} field: {}'.format(field.name, e)) from e
+
+        instance.index = rule.index
+        return instance
+
+    # generates a function which validates like Validator._validate, the rules of the bound validation are
+    # checked in the same order but the rules with an inline expression are not called.
+    @classmethod
+    def _compile(cls, validation):
+        lines = ['def validate(validator, validation, first_error, stop):',
+                 '    data = validator.data',
+                 '    get = data.get',
+                 '    set_failed = validator._set_failed',
+                 '    get_first_failure = validator._get_first_failure']
+        constants = {}
+
+        for i, (_, rules, bail) in enumerate(validation):
+            lines.extend(['    name, rules, _ = validation[{}]'.format(i),
+                          '    value = get(name)',
+                          '    failed = []',
+                          '    while True:'])
+
+            for j, rule in enumerate(rules):
+                inline = cls._get_inline(rule)
+                if inline:
+                    expression, values = inline
+                    names = dict((key, 'c{}_{}_{}'.format(i, j, key)) for key in values)
+                    constants.update((names[key], value) for key, value in values.items())
+                    check = expression.format(**names)
+                    lines.extend(['        if not ({}):'.format(check),
+                                  '            failed.append(rules[{}])'.format(j)])
+                else:
+                    lines.extend(['        status = rules[{}].check(value, data)'.format(j),
+                                  '        if not status:',
+                                  '            failed.append(get_failure(rules[{}], status))'.format(j)])
+
+                lines.extend(['            if {}:'.format('True' if bail else 'stop'),
+                              '                failed[0] = get_first_failure(rules[{}:], failed[0], name, '
+                              'value)'.format(j + 1),
+                              '                break'])
+
+            lines.extend(['        break',
+                          '    if failed:',
+                          '        set_failed(name, value, failed)',
+                          '        if first_error:',
+                          '            return'])
+
+        namespace = dict(constants, get_failure=get_failure)
+        exec(compile('\n'.join(lines), '<validation>', 'exec'), namespace)
+        return namespace['validate']
+
+    @classmethod
+    def _get_inline(cls, rule):
+        if type(rule) is FusedRule:
+            return rule.get_inline()
+        return cls._call_rule(rule, 'get_inline')
+
+    @staticmethod
+    def _call_rule(rule, name):
+        # the method is only called when the rule checks the values with the methods of the class defining it
+        if type(rule) is not RuleAdapter or rule.batch or rule.per_value:
+            return None
+
+        rule_class = rule.rule_class
+        owner = next(klass for klass in rule_class.__mro__ if name in vars(klass))
+        if owner is BaseRule:
+            return None
+
+        for method in ('check', 'check_value', 'check_null', 'get_status'):
+            if getattr(rule_class, method) is not getattr(owner, method):
+                return None
+
+        return getattr(rule.prototype, name)()
+
+    def check_params(self):
+        # the params of the default rules are parsed when the validator class is created,
+        # so the wrong params are raised when the validators are imported.
+        for field in self.fields:
+            for rule in field.rules:
+                rule_class = default_rules.get(rule.name, None)
+                if rule_class is None or not getattr(rule_class, 'param_schema', None):
+                    continue
+
+                try:
+                    rule_class.parse_params(rule.get_args(rule_class))
+                except (InvalidRuleParamterError, RuleMissedParameterError) as e:
+                    raise type(e)('{} field: {}'.format(field.name, e)) from e
+
+    def _get_field(self, name, validation, message):
+        infos = list(self._get_rules(validation))
+        bail = any(self.bail == info['name'] for info in infos)
+        infos = [info for info in infos if self.bail != info['name']]
+        rules = tuple(RulePlan(info['name'], info['params'], message.get(info['name'], None), index)
+                      for index, info in enumerate(infos))
+        return FieldPlan(name, rules, bail)
+
+    def _get_rules(self, validation):
+        rules = map(self._get_rule_info, validation.split('|'))
+        return rules
+
+    @staticmethod
+    def _get_rule_info(rule):
+        info = list(map(lambda s: s.strip(), rule.split(':', 1)))
+        name = info[0]
+        params = info[1] if len(info) == 2 else ''
+        rules = {'name': name, 'params': params}
+        return rules
+
+
+# the result of a record, the records which raised an exception with catch_errors are failed and keep the
+# exception as their error
+class ValidationResult:
+    __slots__ = ('index', 'status', 'failures', 'data', 'rendered', 'error')
+
+    def __init__(self, index, status, failures=None, data=None, error=None):
+        self.index = index
+        self.status = status
+        self.failures = failures
+        self.data = data
+        self.rendered = None
+        self.error = error
+
+    def __bool__(self):
+        return self.status
+
+    def get_status(self):
+        return self.status
+
+    def get_message(self):
+        return self.render()[0]
+
+    def get_message_plain(self):
+        return self.render()[1]
+
+    def render(self):
+        if self.rendered is None:
+            self.rendered = self.render_failures(self.failures, self.data)
+        return self.rendered
+
+    # the failures are recorded as (field name, rule name, rule, value) and they are only formatted
+    # here, the failures without a rule have the formatted message as their value.
+    @staticmethod
+    def render_failures(failures, data=None):
+        message = {}
+        message_plain = {}
+
+        for name, rule_name, rule, value in failures if failures else []:
+            text = rule.get_message(value, data) if rule is not None else value
+            message.setdefault(name, {}).update({rule_name: text})
+            message_plain.setdefault(name, []).append(text)
+
+        return message, message_plain
+
+
+class ValidationResults(list):
+    def get_status(self):
+        return all(result.status for result in self)
+
+    def get_failed(self):
+        return [result for result in self if not result.status]
+
+    def get_message(self):
+        return dict((result.index, result.get_message()) for result in self.get_failed())
+
+    def get_message_plain(self):
+        return dict((result.index, result.get_message_plain()) for result in self.get_failed())
+
+
+# aggregates the timings reported by the rule hook of a Validator, by rule and by field
+class RuleProfiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rules = {}
+        self.fields = {}
+
+    def __call__(self, name, rule_name, duration, status):
+        with self.lock:
+            self._add(self.rules, rule_name, duration, status)
+            self._add(self.fields, name, duration, status)
+
+    @staticmethod
+    def _add(stats, key, duration, status):
+        stat = stats.get(key, None)
+        if stat is None:
+            stats[key] = stat = {'count': 0, 'failures': 0, 'total': 0.0, 'max': 0.0}
+        stat['count'] += 1
+        stat['failures'] += 0 if status else 1
+        stat['total'] += duration
+        stat['max'] = max(stat['max'], duration)
+
+    def get_stats(self, by='rule'):
+        with self.lock:
+            stats = self.rules if 'rule' == by else self.fields
+            stats = [dict(stat, name=key, mean=stat['total'] / stat['count']) for key, stat in stats.items()]
+        return sorted(stats, key=lambda d: d['total'], reverse=True)
+
+    def reset(self):
+        with self.lock:
+            self.rules = {}
+            self.fields = {}
+
+    def report(self, by='rule'):
+        lines = ['{:<24} {:>10} {:>10} {:>12} {:>12} {:>12}'.format(by, 'count', 'failures', 'total ms',
+                                                                  'mean us', 'max us')]
+        for stat in self.get_stats(by):
+            lines.append('{:<24} {:>10} {:>10} {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+                str(stat['name']), stat['count'], stat['failures'], stat['total'] * 1e3, stat['mean'] * 1e6,
+                stat['max'] * 1e6))
+        return '\n'.join(lines)
+
+
 class MetaValidator(type):
+    # the options share the class namespace with the fields, so a field can not be named like them
+    options = ('copy_data', 'bail', 'first_error', 'io_workers', 'rule_hook', 'compiled', 'metrics')
+
     def __new__(mcs, *args, **kwargs):
         name, base, attrs = args
+        for option in mcs.options:
+            if isinstance(attrs.get(option, None), str):
+                raise ReservedFieldError(option)
+
         attrs.update({'validation': mcs.get_attrs(attrs)})
-        return super().__new__(mcs, *args)
+        cls = super().__new__(mcs, *args)
+        cls.plan = ValidationPlan(cls.validation, getattr(cls, 'message', None))
+        cls.plan.check_params()
+        return cls
 
     @staticmethod
     def get_attrs(attrs):
@@ -1298,20 +2563,152 @@ class MetaValidator(type):
 
 
 class Validator(metaclass=MetaValidator):
-
-    def __init__(self, data, request=None, extra_rules=None):
-        self.data = deepcopy(data)
+    copy_data = False
+    bail = False
+    first_error = False
+    io_workers = 0
+    rule_hook = None
+    metrics = None
+    compiled = False
+
+    executors = {}
+    executors_lock = threading.Lock()
+
+    def __init__(self, data, request=None, extra_rules=None, first_error=None, executor=None, rule_hook=None):
         self.request = request
         self.extra_rules = extra_rules
-        self.status = True
-        self.validate_message = {}
-        self.validate_message_plain = {}
+        self.first_error = self.first_error if first_error is None else first_error
+        self.executor = executor
+        # the hook is read from the class so a plain function is not bound as a method
+        self.rule_hook = type(self).rule_hook if rule_hook is None else rule_hook
+        if self.metrics is not None and self.rule_hook is None:
+            self.rule_hook = self.metrics.get_rule_hook(type(self).__name__)
+        self._reset(data)
 
     def validate(self):
-        validation = self._get_validation()
-        self._validate(validation)
+        validation = self.plan.bind(self.extra_rules)
+        lookup_rules = self.plan.get_lookup_rules(self.extra_rules)
+        executor = self._get_executor()
+        if executor:
+            self._validate_concurrently(validation, executor, lookup_rules)
+        elif len(lookup_rules) > 1:
+            self._validate_deferred(validation, lookup_rules)
+        else:
+            self._validate(validation)
+        self._observe()
         return self.status
 
+    async def avalidate(self):
+        validation = self.plan.bind(self.extra_rules)
+        await self._avalidate(validation, self.plan.get_lookup_rules(self.extra_rules))
+        self._observe()
+        return self.status
+
+    @classmethod
+    def validate_many(cls, records, request=None, extra_rules=None, first_error=None):
+        records = records if isinstance(records, (list, tuple)) else list(records)
+        validator = cls(None, request=request, extra_rules=extra_rules, first_error=first_error)
+        return ValidationResults(validator._iter_results(records))
+
+    @classmethod
+    def validate_iter(cls, records, chunk_size=1000, request=None, extra_rules=None, first_error=None,
+                      catch_errors=False):
+        # the records are read and validated by chunks, so any iterable could be validated in a constant memory
+        validator = cls(None, request=request, extra_rules=extra_rules, first_error=first_error)
+        for offset, chunk in cls._iter_chunks(records, chunk_size):
+            yield from validator._iter_results(chunk, offset, catch_errors)
+
+    @classmethod
+    def validate_parallel(cls, records, workers=None, chunk_size=1000, extra_rules=None, first_error=None,
+                          mp_context=None):
+        results = cls.iter_parallel(records, workers=workers, chunk_size=chunk_size, extra_rules=extra_rules,
+                                    first_error=first_error, mp_context=mp_context)
+        return ValidationResults(results)
+
+    @classmethod
+    def iter_parallel(cls, records, workers=None, chunk_size=1000, extra_rules=None, first_error=None,
+                      mp_context=None, catch_errors=False):
+        # the records are validated by chunks in worker processes and the results are yielded in the order
+        # of the records, only a few chunks for every worker are kept in memory.
+        workers = workers if workers else os.cpu_count() or 1
+        validation = cls.plan.bind(extra_rules)
+        rules = dict(((name, rule.index), rule) for name, field_rules, _ in validation for rule in field_rules)
+        initargs = (cls, cls.plan, extra_rules, first_error, catch_errors)
+
+        # the executors of python 3.6 have no initializer, the workers are set up by their first chunks there
+        if sys.version_info >= (3, 7):
+            options = {'mp_context': mp_context, 'initializer': _init_worker, 'initargs': initargs}
+            chunk_args = ()
+        else:
+            options = {}
+            chunk_args = (initargs,)
+
+        with ProcessPoolExecutor(max_workers=workers, **options) as executor:
+            pending = deque()
+            for offset, chunk in cls._iter_chunks(records, chunk_size):
+                pending.append((offset, chunk, executor.submit(_validate_chunk, offset, chunk, *chunk_args)))
+                if len(pending) >= workers * 2:
+                    yield from cls._merge_chunk(*pending.popleft(), rules=rules)
+
+            while pending:
+                yield from cls._merge_chunk(*pending.popleft(), rules=rules)
+
+    @staticmethod
+    def _iter_chunks(records, chunk_size):
+        records = iter(records)
+        offset = 0
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield offset, chunk
+            offset = offset + len(chunk)
+
+    @staticmethod
+    def _merge_chunk(offset, records, future, rules):
+        failed = future.result()
+        for index, record in enumerate(records, offset):
+            failures = failed.get(index, None)
+            if failures is None:
+                yield ValidationResult(index, True)
+            elif isinstance(failures, str):
+                yield ValidationResult(index, False, data=record, error=failures)
+            else:
+                failures = [(name, rule_name, rules.get((name, rule), None), value)
+                            for name, rule_name, rule, value in failures]
+                yield ValidationResult(index, False, failures, record)
+
+    def _iter_results(self, records, offset=0, catch_errors=False):
+        # with catch_errors, the records whose rules raise an exception are failed with the exception as their
+        # error and the other records are still validated, the batch is checked record by record when its
+        # lookups raise.
+        validation = self.plan.bind(self.extra_rules)
+        try:
+            validation = self.plan.prepare(validation, records)
+        except Exception:
+            if not catch_errors:
+                raise
+
+        # the rules prepared for the batch have resolved their lookups already
+        prepared = set(rule for _, rules, _ in validation for rule in rules)
+        lookup_rules = tuple((name, rule) for name, rule in self.plan.get_lookup_rules(self.extra_rules)
+                             if rule in prepared)
+        for index, record in enumerate(records, offset):
+            self._reset(record)
+            try:
+                if len(lookup_rules) > 1:
+                    self._validate_deferred(validation, lookup_rules)
+                else:
+                    self._validate(validation)
+            except Exception as e:
+                if not catch_errors:
+                    raise
+                yield ValidationResult(index, False, data=record, error='{}: {}'.format(type(e).__name__, e))
+                continue
+
+            self._observe()
+            yield self._get_result(index)
+
     def get(self, name, default=None):
         return self.data.get(name, default)
 
@@ -1325,61 +2722,361 @@ class Validator(metaclass=MetaValidator):
         return self.validate_message_plain
 
     def set_message(self, name, rule, message):
-        self.validate_message.update({name: {}}) if name not in self.validate_message.keys() else None
-        self.validate_message[name].update({rule: message})
+        # the failures are counted by the metrics with the validation they belong to
+        self.failures.append((name, rule, None, message))
+        self._add_rendered(name, rule, message)
+
+    # the messages are rendered from the failures when they are read first, the messages read or assigned
+    # are kept and the later failures are added to them
+    @property
+    def validate_message(self):
+        return self._render()[0]
+
+    @validate_message.setter
+    def validate_message(self, message):
+        self.rendered = message, self._render()[1]
+
+    @property
+    def validate_message_plain(self):
+        return self._render()[1]
+
+    @validate_message_plain.setter
+    def validate_message_plain(self, message_plain):
+        self.rendered = self._render()[0], message_plain
+
+    def _render(self):
+        if self.rendered is None:
+            self.rendered = ValidationResult.render_failures(self.failures, self.data)
+        return self.rendered
+
+    def _add_rendered(self, name, rule_name, text):
+        if self.rendered is not None:
+            message, message_plain = self.rendered
+            message.setdefault(name, {}).update({rule_name: text})
+            message_plain.setdefault(name, []).append(text)
+
+    def _get_executor(self):
+        if self.executor or not self.io_workers:
+            return self.executor
+
+        executor = self.executors.get(self.io_workers, None)
+        if executor is None:
+            with self.executors_lock:
+                executor = self.executors.get(self.io_workers, None)
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=self.io_workers,
+                                                  thread_name_prefix='validator-io')
+                    self.executors[self.io_workers] = executor
+        return executor
+
+    def _reset(self, data):
+        self.data = deepcopy(data) if self.copy_data else DataView(data)
+        self.status = True
+        self.failures = []
+        self.rendered = None
 
-        self.validate_message_plain.update({name: []}) if name not in self.validate_message_plain.keys() else None
-        self.validate_message_plain[name].append(message)
+    def _resolve_lookups(self, rules):
+        for model, lookups in self._get_lookups(rules).items():
+            self.data.lookups.update(resolve_lookups(model, lookups))
+
+    def _get_lookups(self, rules):
+        # the lookups of the database rules are grouped by their models, the models with more than
+        # one lookup are resolved by one query before the database rules are checked.
+        if len(rules) < 2 or getattr(self.data, 'lookups', None) is None:
+            return {}
+
+        grouped = {}
+        for name, rule in rules:
+            value = self.get(name)
+            lookup = rule.get_lookup(value) if value else None
+            if lookup is None:
+                continue
+
+            model, field, value = lookup
+            try:
+                grouped.setdefault(model, set()).add((field, value))
+            except TypeError:
+                continue
+
+        return dict((model, lookups) for model, lookups in grouped.items() if len(lookups) > 1)
+
+    def _observe(self):
+        if self.metrics is not None:
+            self.metrics.observe_validation(type(self).__name__, self.status, self.failures)
+
+    def _get_result(self, index):
+        if self.status:
+            return ValidationResult(index, True)
+        return ValidationResult(index, False, self.failures, self.data)
 
     def _validate(self, validation):
-        for item in validation:
-            name = item.get('name', '')
-            value = item.get('value', '')
-            rules = item.get('rules', [])
-            [self._check_rule(rule, name, value) for rule in rules]
-
-    def _get_rule(self, rule_info, name, value):
-        rule_name = rule_info.get('name')
-        params = rule_info.get('params')
-        rule_class = self._get_origin_rule(rule_name)
-        message = getattr(self, 'message', {}).get(name, {}).get(rule_name, None)
-        instance = rule_class(name, value, params, data=self.data, message=message)
-        return instance
+        if self.compiled and self.rule_hook is None:
+            function = self.plan.compile(self.extra_rules)
+            return function(self, validation, self.first_error, self.first_error or self.bail)
 
-    def _get_origin_rule(self, name):
-        rule = self.extra_rules.get(name, None) if self.extra_rules else default_rules.get(name, None)
-        if not rule:
-            raise RuleNotFoundError(name)
+        for name, rules, bail in validation:
+            value = self.get(name)
+            failed = []
+            for position, rule in enumerate(rules):
+                status = self._check_rule(rule, name, value)
+                if status:
+                    continue
+
+                failed.append(get_failure(rule, status))
+                if self.first_error or bail or self.bail:
+                    failed[0] = self._get_first_failure(rules[position + 1:], failed[0], name, value)
+                    break
+
+            if failed:
+                self._set_failed(name, value, failed)
+                if self.first_error:
+                    return
+
+    async def _avalidate(self, validation, lookup_rules=()):
+        pending = self._check_inline(validation)
+        for model, lookups in self._get_lookups(self._get_live_rules(pending, lookup_rules)).items():
+            self.data.lookups.update(await aresolve_lookups(model, lookups))
+
+        checks = [self._acheck_rule(rule, name, value) for name, value, _, _, awaiting in pending for rule in awaiting]
+        self._set_pending(pending, await asyncio.gather(*checks))
+
+    def _validate_concurrently(self, validation, executor, lookup_rules=()):
+        pending = self._check_inline(validation)
+        self._resolve_lookups(self._get_live_rules(pending, lookup_rules))
+        checks = [(rule, name, value) for name, value, _, _, awaiting in pending for rule in awaiting]
+
+        if len(checks) > 1:
+            # the connections of the worker threads are out of the transaction of the caller, so the database
+            # rules are checked by the caller in a transaction, while the other rules are checked in the pool
+            atomic = self._in_atomic_block()
+            futures = [None if atomic and rule.database else executor.submit(self._check_io_rule, rule, name, value)
+                       for rule, name, value in checks]
+            statuses = [future.result() if future else self._check_rule(*check)
+                        for future, check in zip(futures, checks)]
         else:
-            return rule
+            statuses = [self._check_rule(*check) for check in checks]
 
-    def _check_rule(self, rule_info, name, value):
-        rule = self._get_rule(rule_info, name, value)
-        rule.check()
-        if not rule.get_status():
-            self.status = False
-            self.set_message(name, rule_info.get('name'), rule.get_message())
+        self._set_pending(pending, statuses)
 
-    def _get_validation(self):
-        ret = []
-        for name, validation in self.validation.items():
-            rules = self._get_rules(validation)
-            value = self.get(name)
-            data = {'name': name, 'value': value, 'rules': list(rules)}
-            ret.append(data)
-        return ret
+    def _validate_deferred(self, validation, lookup_rules):
+        # the rules without I/O of every field are checked first, so the grouped lookups are only resolved for
+        # the database rules which are still checked, then the I/O rules are checked one by one like _validate.
+        pending = self._check_inline(validation)
+        self._resolve_lookups(self._get_live_rules(pending, lookup_rules))
 
-    def _get_rules(self, validation):
-        rules = map(self._get_rule_info, validation.split('|'))
-        return rules
+        for name, value, stop, failed, awaiting in pending:
+            for position, rule in enumerate(awaiting):
+                status = self._check_rule(rule, name, value)
+                if status:
+                    continue
+
+                failure = get_failure(rule, status)
+                if not stop:
+                    failed.append(failure)
+                    continue
+
+                # the I/O rules are only awaiting before the failure of the inline rules, if there is one
+                failed[:] = [self._get_first_failure(awaiting[position + 1:], failure, name, value)]
+                break
+
+            if failed:
+                self._set_failed(name, value, failed)
+                if self.first_error:
+                    return
 
     @staticmethod
-    def _get_rule_info(rule):
-        info = list(map(lambda s: s.strip(), rule.split(':', 1)))
-        name = info[0]
-        params = info[1] if len(info) == 2 else ''
-        rules = {'name': name, 'params': params}
-        return rules
+    def _get_live_rules(pending, lookup_rules):
+        # the database rules of the fields which failed their inline rules and stopped are not checked
+        awaiting = set(rule for _, _, _, _, rules in pending for rule in rules)
+        return tuple((name, rule) for name, rule in lookup_rules if rule in awaiting)
+
+    def _check_inline(self, validation):
+        # the rules without I/O are checked inline, the I/O rules of every field are returned to be checked together
+        pending = []
+        for name, rules, bail in validation:
+            value = self.get(name)
+            stop = self.first_error or bail or self.bail
+            failed = []
+            awaiting = []
+            for position, rule in enumerate(rules):
+                if rule.cost >= COST_IO:
+                    awaiting.append(rule)
+                    continue
+
+                status = self._check_rule(rule, name, value)
+                if not status:
+                    failed.append(get_failure(rule, status))
+                    if stop:
+                        # the I/O rules written before the first failure are still checked
+                        unchecked = rules[position + 1:]
+                        failed[0] = self._get_first_failure(unchecked, failed[0], name, value, inline=True)
+                        awaiting.extend(rule for rule in unchecked
+                                        if rule.cost >= COST_IO and rule.index < failed[0].index)
+                        break
+
+            pending.append((name, value, stop, failed, awaiting))
+            if failed and self.first_error:
+                break
+
+        return pending
+
+    def _set_pending(self, pending, statuses):
+        statuses = iter(statuses)
+        for name, value, stop, failed, awaiting in pending:
+            for rule, status in [(rule, next(statuses)) for rule in awaiting]:
+                if status:
+                    continue
+
+                failure = get_failure(rule, status)
+                if not stop:
+                    failed.append(failure)
+                elif not failed or failure.index < failed[0].index:
+                    failed[:] = [failure]
+
+            if failed:
+                self._set_failed(name, value, failed)
+                if self.first_error:
+                    return
+
+    def _check_io_rule(self, rule, name, value):
+        # the worker threads do not see the end of the requests, so the database connections they open are
+        # handled after every check like the ones of the request threads, the persistent ones are kept.
+        try:
+            return self._check_rule(rule, name, value)
+        finally:
+            try:
+                from django.db import close_old_connections
+            except ImportError:
+                pass
+            else:
+                close_old_connections()
+
+    @staticmethod
+    def _in_atomic_block():
+        try:
+            from django.db import connections
+            from django.core.exceptions import ImproperlyConfigured
+        except ImportError:
+            return False
+
+        try:
+            return any(connections[alias].in_atomic_block for alias in connections)
+        except ImproperlyConfigured:
+            return False
+
+    def _get_first_failure(self, rules, failure, name, value, inline=False):
+        # the rules are checked from the cheapest one, so when a rule fails and the rest rules are skipped,
+        # the unchecked rules written before it are checked in their order to report the first written failure.
+        for rule in sorted((rule for rule in rules if rule.index < failure.index), key=lambda d: d.index):
+            if inline and rule.cost >= COST_IO:
+                continue
+
+            status = self._check_rule(rule, name, value)
+            if not status:
+                return get_failure(rule, status)
+
+        return failure
+
+    def _check_rule(self, rule, name, value):
+        if self.rule_hook is None:
+            return rule.check(value, self.data)
+
+        begin = time.perf_counter()
+        status = rule.check(value, self.data)
+        self.rule_hook(name, rule.name, time.perf_counter() - begin, True if status else False)
+        return status
+
+    async def _acheck_rule(self, rule, name, value):
+        if self.rule_hook is None:
+            return await rule.acheck(value, self.data)
+
+        begin = time.perf_counter()
+        status = await rule.acheck(value, self.data)
+        self.rule_hook(name, rule.name, time.perf_counter() - begin, True if status else False)
+        return status
+
+    def _set_failed(self, name, value, rules):
+        # the rules are checked in the order of their costs, but the messages are set in the order of the rules
+        self.status = False
+        for rule in sorted(rules, key=lambda d: d.index) if len(rules) > 1 else rules:
+            self.failures.append((name, rule.name, rule, value))
+            if self.rendered is not None:
+                self._add_rendered(name, rule.name, rule.get_message(value, self.data))
+
+
+# the state of the worker processes of Validator.iter_parallel
+_worker = {}
+
+
+def _init_worker(validator_class, plan, extra_rules, first_error, catch_errors=False):
+    try:
+        import django
+        from django.apps import apps
+        from django.conf import settings
+    except ImportError:
+        pass
+    else:
+        if not apps.ready and os.environ.get('DJANGO_SETTINGS_MODULE', None):
+            django.setup()
+
+        if settings.configured:
+            # the forked database connections belong to the parent process, they are put aside without
+            # closing them, the worker opens its own connections when it needs.
+            from django.db import connections
+            for connection in connections.all():
+                if connection.connection is not None:
+                    _worker.setdefault('connections', []).append(connection.connection)
+                    connection.connection = None
+
+    validator = validator_class(None, extra_rules=extra_rules, first_error=first_error)
+    validator.plan = plan
+    _worker['validator'] = validator
+    _worker['catch_errors'] = catch_errors
+
+
+def _validate_chunk(offset, records, initargs=None):
+    if initargs is not None and 'validator' not in _worker:
+        _init_worker(*initargs)
+
+    # the errors of the records are sent back as their text
+    validator = _worker['validator']
+    failed = {}
+    for result in validator._iter_results(records, offset, _worker['catch_errors']):
+        if result.error is not None:
+            failed[result.index] = result.error
+        elif not result.status:
+            failed[result.index] = [_get_chunk_failure(failure, result.data) for failure in result.failures]
+    return failed
+
+
+def _get_chunk_failure(failure, data):
+    # the rules are sent back by their indexes, the messages of the checked rule instances are rendered here
+    name, rule_name, rule, value = failure
+    if type(rule) is RuleFailure:
+        return name, rule_name, None, rule.get_message(value, data)
+    return name, rule_name, rule.index if rule is not None else None, value
+
+
+def avalidate_view(validator_class, extra_rules=None, status=400):
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            data = request.GET if request.method in ('GET', 'HEAD') else request.POST
+            if request.FILES:
+                data = copy(data)
+                data.update(request.FILES)
+
+            validator = validator_class(data, request=request, extra_rules=extra_rules)
+            if not await validator.avalidate():
+                from django.http import JsonResponse
+                return JsonResponse(validator.get_message(), status=status)
+
+            request.validator = validator
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 default_rules = {